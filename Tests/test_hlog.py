@@ -1,4 +1,4 @@
-import os, sys, pytest, logging, re, tempfile
+import os, sys, pytest, logging, re, tempfile, threading, asyncio, time, json, gzip
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
@@ -65,6 +65,88 @@ class TestHierarchicalLog:
         assert recordingHandler.at( 1 ).message == "1", "Check Handler record 1"
         assert recordingHandler.at( 10 ).message == "10", "Check Handler record 10"
 
+    def test_RingBuffer(self):
+        ringBuffer = RingBuffer(3)
+        for i in range(5):
+            ringBuffer.append(i)
+
+        assert len(ringBuffer) == 3
+        assert list(ringBuffer) == [2, 3, 4]
+        assert ringBuffer[0] == 2
+        assert ringBuffer[-1] == 4
+        ringBuffer[1] = 13
+        assert ringBuffer[1] == 13
+        with pytest.raises(IndexError):
+            ringBuffer[3]
+
+        idxs = RingBuffer(2, 'q', -1)
+        idxs.append(7)
+        assert list(idxs) == [7]
+        idxs.clear()
+        assert len(idxs) == 0
+
+    def test_ColumnarRecordingHandler(self):
+        recordingHandler = RecordingHandler(4, columnar = True)
+        self.logger.addHandler(recordingHandler)
+        self.fillLog()
+        self.logger.warning("01")
+        self.logger.removeHandler(recordingHandler)
+
+        assert recordingHandler.minIdx() == 2
+        assert recordingHandler.at( 1 ) == None
+        assert recordingHandler.at( 3 ).message == "11"
+        assert recordingHandler.at( 3 ).idx == 3
+        assert recordingHandler.at( 3 ).hierarchyStage == 1
+        assert recordingHandler.at( 3 ) is recordingHandler.at( 3 ), "Materialized records are kept"
+        assert recordingHandler.getFilteredChildren( None ) == [4, 5]
+        assert recordingHandler.parentRecord( 2 ) == None
+        assert len( recordingHandler.records.messages ) == 3, "01 is stored once"
+
+        columns = recordingHandler.to_arrays()
+        assert list( columns['idx'] ) == [2, 3, 4, 5]
+        assert list( columns['levelno'] ) == [logging.DEBUG, logging.WARNING, logging.WARNING, logging.WARNING]
+        assert list( columns['hierarchyStage'] ) == [2, 1, 0, 0]
+        assert list( columns['parentIdx'] ) == [1, 0, -1, -1]
+        assert columns['messages'][ columns['messageId'][3] ] == "01"
+
+        self.logger.addHandler(recordingHandler)
+        self.logger.info( "value %d", 1 )
+        self.logger.info( "value %d", 2 )
+        self.logger.removeHandler(recordingHandler)
+        assert recordingHandler.records.templateAt( 3 ) == "value %d", "Template kept for spanProfile"
+        assert recordingHandler.at( 7 ).getMessage() == "value 2"
+
+    def test_SlimHLogRecord(self):
+        resetLogHierarchy(self.logger)
+        initLogHierarchy(self.logger, slimRecords = True)
+        self.fileHandler.setFormatter(logging.Formatter('%(threadName)s %(module)s %(message)s'))
+        self.fillLog()
+        self.fileHandler.close()
+
+        record = self.recordingHandler.at( 2 )
+        assert isinstance( record, SlimHLogRecord )
+        assert not 'hierarchyStage' in record.__dict__, "Hierarchy members are slots"
+        assert record.hierarchyStage == 2
+        assert record.threadName == None, "Skipped field"
+        assert record.message == "20"
+        assert self.recordingHandler.parentIdx( 2 ) == 1
+        assert self.logFileContent( self.logFile )[2] == "None test_hlog 20\n"
+
+    def test_SlimHLogRecordMaterialized(self):
+        resetLogHierarchy(self.logger)
+        initLogHierarchy(self.logger, slimRecords = True)
+        columnarHandler = RecordingHandler( 2, columnar = True, spill = True )
+        self.logger.addHandler( columnarHandler )
+        self.fillLog()
+        self.logger.removeHandler( columnarHandler )
+
+        record = columnarHandler.at( 3 )
+        assert ( record.idx, record.hierarchyStage ) == ( 3, 1 ), "Materialized from the columns"
+        record = columnarHandler.at( 1 )
+        assert columnarHandler.isSpilled( 1 )
+        assert ( record.idx, record.hierarchyStage ) == ( 1, 1 ), "Restored from the spill"
+        columnarHandler.close()
+
     # Test if, hierarchy stage can be set in python logging system
     # @unittest.skip("skipped temporarily")
     def test_EnterLowerLogHierarchyStage(self):
@@ -100,6 +182,263 @@ class TestHierarchicalLog:
         assert self.recordingHandler.at(1).hierarchyStage == 1 , "Check Hierarchy stage"
         assert self.recordingHandler.at(2).hierarchyStage == 0 , "Check Hierarchy stage"
     
+    def test_spanProfile(self):
+        @logHierarchyStage( self.logger, "step" )
+        def step():
+            time.sleep( 0.002 )
+            with EnterLowerLogHierarchyStage( "inner", self.logger ):
+                time.sleep( 0.002 )
+
+        with EnterLowerLogHierarchyStage( "pipeline", self.logger ):
+            for i in range( 3 ):
+                step()
+            self.logger.info( "done" )
+
+        def function():
+            lowerHierarchyStage = LowerLogHierarchyStage( self.logger, "function" )
+            self.logger.info( "in function" )
+        function()
+
+        assert self.recordingHandler.at( 1 ).hierarchyStage == 1
+        assert self.recordingHandler.at( 2 ).hierarchyStage == 2
+        assert self.recordingHandler.spanDurationNs( 7 ) == None, "No span"
+        stepDurationNs = self.recordingHandler.spanDurationNs( 1 )
+        assert stepDurationNs >= 4000000
+        assert self.recordingHandler.spanSelfTimeNs( 1 ) == stepDurationNs - self.recordingHandler.spanDurationNs( 2 )
+        assert self.recordingHandler.spanDurationNs( 8 ) != None
+
+        profile = self.recordingHandler.spanProfile()
+        assert list( profile.keys() )[0] == "pipeline"
+        assert profile["step"]['count'] == 3
+        assert profile["inner"]['p50Ns'] <= profile["inner"]['p99Ns'] <= profile["inner"]['totalNs']
+        assert profile["pipeline"]['selfNs'] == profile["pipeline"]['totalNs'] - profile["step"]['totalNs']
+
+    def test_exportTrace(self):
+        traceFile = os.path.join( self.workDir, 'test.trace.json' )
+        self.fileHandler.setFormatter( HLogFormatter('%(asctime)s - %(levelname)8s - %(message)s', '%y-%m-%d %H:%M:%S') )
+        with EnterLowerLogHierarchyStage( "outer", self.logger ):
+            with EnterLowerLogHierarchyStage( "inner", self.logger ):
+                time.sleep( 0.002 )
+            self.logger.info( "leaf" )
+        self.logger.info( "last" )
+        self.fileHandler.close()
+
+        self.recordingHandler.exportTrace( traceFile )
+        with open( traceFile ) as f:
+            events = { event['name'] : event for event in json.load( f )['traceEvents'] }
+        assert events['inner']['dur'] >= 2000
+        assert events['inner']['ts'] + events['inner']['dur'] <= events['leaf']['ts'] + 1
+        assert events['outer']['ts'] + events['outer']['dur'] >= events['leaf']['ts'] + events['leaf']['dur']
+
+        self.recordingHandler.exportTrace( traceFile, 'speedscope' )
+        with open( traceFile ) as f:
+            trace = json.load( f )
+        frames = [ frame['name'] for frame in trace['shared']['frames'] ]
+        assert [ ( event['type'], frames[ event['frame'] ] ) for event in trace['profiles'][0]['events'] ] == \
+            [ ('O','outer'), ('O','inner'), ('C','inner'), ('O','leaf'), ('C','leaf'), ('C','outer'), ('O','last'), ('C','last') ]
+
+        logFileReader = HLogFileReader( self.logger, '%(asctime)s - %(levelname)8s - %(message)s' )
+        logFileReader.exportTrace( self.logFile, traceFile )
+        with open( traceFile ) as f:
+            assert [ event['name'] for event in json.load( f )['traceEvents'] ] == [ 'inner', 'leaf', 'outer', 'last' ]
+        assert len( self.recordingHandler.records ) == 4, "Exporting a file does not log"
+
+        # the closed file handler reopens the file for appending
+        for i in range( 3 ):
+            self.logger.info( "value %d", i * 10 )
+        self.fileHandler.close()
+        logFileReader.exportTrace( self.logFile, traceFile, 'speedscope' )
+        with open( traceFile ) as f:
+            assert [ frame['name'] for frame in json.load( f )['shared']['frames'] ] == [ 'outer', 'inner', 'leaf', 'last', 'value #' ]
+
+    def test_binaryLog(self):
+        binaryFile = os.path.join( self.workDir, 'test.hlogb' )
+        textFile = os.path.join( self.workDir, 'test.converted.log' )
+        formatter = HLogFormatter('%(asctime)s - %(levelname)8s - %(message)s', '%y-%m-%d %H:%M:%S')
+        self.fileHandler.setFormatter( formatter )
+        binaryHandler = HLogBinaryHandler( binaryFile )
+        self.logger.addHandler( binaryHandler )
+        warningFile = os.path.join( self.workDir, 'test.warning.hlogb' )
+        warningHandler = HLogBinaryHandler( warningFile )
+        warningHandler.setLevel( logging.WARNING )
+        self.logger.addHandler( warningHandler )
+        self.fillLog()
+        with EnterLowerLogHierarchyStage( "äöü", self.logger ):
+            self.logger.info( "value %d", 42 )
+            try:
+                raise ValueError( "bad" )
+            except ValueError:
+                self.logger.exception( "failed" )
+        self.logger.removeHandler( binaryHandler )
+        binaryHandler.close()
+        self.logger.removeHandler( warningHandler )
+        warningHandler.close()
+        self.fileHandler.close()
+
+        reader = HLogBinaryReader()
+        assert [ record.idx for record in reader.records( warningFile ) ] == \
+            [ record.idx for record in self.recordingHandler.records if record.levelno >= logging.WARNING ], "Gaps kept"
+        reader.toText( binaryFile, textFile, formatter )
+        assert self.logFileContent( textFile ) == self.logFileContent( self.logFile )
+
+        recordingHandler = RecordingHandler()
+        assert reader.read( binaryFile, recordingHandler, batchSize = 3 ) == os.path.getsize( binaryFile )
+        assert len( recordingHandler.records ) == len( self.recordingHandler.records )
+        for idx in range( len( recordingHandler.records ) ):
+            assert recordingHandler.at( idx ).getMessage().split('\n')[0] == self.recordingHandler.at( idx ).getMessage()
+            assert recordingHandler.at( idx ).levelno == self.recordingHandler.at( idx ).levelno
+            assert recordingHandler.parentIdx( idx ) == self.recordingHandler.parentIdx( idx )
+        assert recordingHandler.at( 7 ).getMessage().endswith( "ValueError: bad" )
+
+    def test_spill(self):
+        recordingHandler = RecordingHandler( 3, spill = True, spillDirectory = self.workDir )
+        self.logger.addHandler( recordingHandler )
+        with EnterLowerLogHierarchyStage( "outer", self.logger ):
+            self.logger.info( "a" )
+            self.logger.warning( "b" )
+            self.logger.info( "c" )
+        self.logger.info( "last" )
+        self.logger.info( "x" )
+
+        assert recordingHandler.minIdx() == 3
+        assert recordingHandler.at( 0 ).msg == "outer"
+        assert recordingHandler.at( 2 ).levelno == logging.WARNING
+        assert recordingHandler.parentIdx( 2 ) == 0
+        assert recordingHandler.parentIdx( 3 ) == 0, "Spilled parent of a stored record"
+        assert list( recordingHandler.children( 0 ) ) == [1, 2, 3]
+        assert recordingHandler.subtreeEndIdx( 0 ) == 3, "Link updated after spilling"
+        assert recordingHandler.nextSiblingIdx( 0 ) == 4
+        assert recordingHandler.parentRecord( 3 ).msg == "outer", "Spilled parent record"
+        assert list( recordingHandler.children( None ) ) == [0, 4, 5], "Top level reaches into the spill"
+        recordingHandler.levelNamesFilter['INFO'] = False
+        assert recordingHandler.getFilteredChildren( 0 ) == [2]
+        assert recordingHandler.passedFilter( recordingHandler.at( 2 ) )
+        assert not recordingHandler.passedFilter( recordingHandler.at( 1 ) )
+        assert recordingHandler.cntFilteredChildren( 0 ) == 1
+
+        # rotate out the oldest segments
+        recordingHandler.spill.maxBytes = 1
+        for i in range( 6 ):
+            self.logger.info( "more %d" % i )
+        self.logger.removeHandler( recordingHandler )
+        assert recordingHandler.spill.minIdx == 6, "Only the newest segment is kept"
+        assert recordingHandler.at( 5 ) == None
+        assert recordingHandler.at( 6 ).msg == "more 0"
+        recordingHandler.close()
+        assert not any( name.startswith( 'spill' ) for name in os.listdir( self.workDir ) )
+        segmentHandler = RecordingHandler( 3, spill = True, spillSegmentSize = 2 )
+        assert segmentHandler.spill.segmentSize == 2
+        spillDirectory = segmentHandler.spill.directory
+        segmentHandler.close()
+        assert not os.path.exists( spillDirectory ), "Temporary spill directory removed"
+
+    def test_HierarchyStagePerThread(self):
+        entered = threading.Event()
+        logged = threading.Event()
+
+        def worker():
+            with EnterLowerLogHierarchyStage( "worker", self.logger ):
+                entered.set()
+                logged.wait()
+                self.logger.info( "worker child" )
+
+        thread = threading.Thread( target=worker )
+        thread.start()
+        entered.wait()
+        self.logger.info( "main" )
+        logged.set()
+        thread.join()
+
+        stages = { record.msg : record.hierarchyStage for record in self.recordingHandler.records }
+        assert stages == { "worker" : 0, "main" : 0, "worker child" : 1 }
+        assert getHierarchyStage( self.logger ) == 0
+
+    def test_HierarchyStagePerTask(self):
+        async def task(name):
+            async with EnterLowerLogHierarchyStage( name, self.logger ):
+                await asyncio.sleep( 0 )
+                self.logger.info( name + " child" )
+                await asyncio.sleep( 0 )
+
+        async def main():
+            await asyncio.gather( task( "a" ), task( "b" ) )
+
+        asyncio.run( main() )
+
+        stages = { record.msg : record.hierarchyStage for record in self.recordingHandler.records }
+        assert stages == { "a" : 0, "b" : 0, "a child" : 1, "b child" : 1 }
+
+    def test_emitMany(self):
+        class NotifiedHandler(RecordingHandler):
+            def __init__(self):
+                super().__init__(4)
+                self.notifications = []
+            def recordsAppended(self, firstIdx, lastIdx):
+                self.notifications.append( (firstIdx, lastIdx) )
+
+        records = []
+        for hierarchyStage,levelNo,msg in [ (0, logging.INFO, "00"), (1, logging.INFO, "10"),
+                                            (2, logging.DEBUG, "20"), (1, logging.WARNING, "11"),
+                                            (0, logging.WARNING, "01") ]:
+            record = logging.makeLogRecord( { 'levelno' : levelNo, 'levelname' : logging.getLevelName(levelNo),
+                                              'msg' : msg, 'hierarchyStage' : hierarchyStage } )
+            records.append( record )
+
+        handler = NotifiedHandler()
+        handler.setLevel( logging.INFO )
+        handler.emitMany( records )
+
+        assert handler.notifications == [ (0, 3) ], "One notification, DEBUG record was dropped"
+        assert [ record.msg for record in handler.records ] == [ "00", "10", "11", "01" ]
+        assert handler.parentIdx( 2 ) == 0
+        assert handler.getFilteredChildren( 0 ) == [1, 2]
+
+        handler.emitMany( records )
+        assert handler.notifications[1] == (4, 7)
+
+    def test_HLogQueueListener(self):
+        self.logger.removeHandler(self.recordingHandler)
+        queueHandler = HLogQueueHandler()
+        self.logger.addHandler(queueHandler)
+        formattedRecords = []
+        formattingHandler = logging.Handler()
+        formattingHandler.emit = lambda record : formattedRecords.append( formattingHandler.format( record ) )
+        listener = HLogQueueListener( queueHandler.queue, self.recordingHandler, formattingHandler, batchSize = 3 )
+        listener.start()
+
+        def producer(name):
+            with EnterLowerLogHierarchyStage( name, self.logger ):
+                for i in range(5):
+                    self.logger.info( "%s %s", name, i )
+
+        threads = [ threading.Thread( target=producer, args=(name,) ) for name in ["a", "b"] ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        listener.stop()
+        self.logger.removeHandler(queueHandler)
+
+        assert len( self.recordingHandler.records ) == 12
+        assert len( formattedRecords ) == 12
+        for name in ["a", "b"]:
+            records = [ record for record in self.recordingHandler.records if record.getMessage().startswith(name) ]
+            assert [ record.getMessage() for record in records ] == [name] + [ f"{name} {i}" for i in range(5) ]
+            assert [ record.hierarchyStage for record in records ] == [0] + [1] * 5
+        assert "a 4" in formattedRecords
+
+        # handler levels ignored by default like by logging.handlers.QueueListener, for the batch path as well
+        records = list( self.recordingHandler.records )
+        warningHandler = RecordingHandler()
+        warningHandler.setLevel( logging.WARNING )
+        listener = HLogQueueListener( queueHandler.queue, warningHandler )
+        listener.handleBatch( records )
+        assert len( warningHandler.records ) == 12
+        warningHandler.clear()
+        listener = HLogQueueListener( queueHandler.queue, warningHandler, respect_handler_level = True )
+        listener.handleBatch( records )
+        assert len( warningHandler.records ) == 0, "Only INFO records"
+
     # Test if, hierarchy stage can be set in python logging system
     # @unittest.skip("skipped temporarily")
     def test_maxIdx(self):
@@ -146,6 +485,140 @@ class TestHierarchicalLog:
         assert self.recordingHandler.cntFilteredChildren( 3 ) == 0
         assert self.recordingHandler.cntFilteredChildren( 4 ) == 0
 
+    def test_cntFilteredChildrenCached( self ):
+        self.fillLog()
+        assert self.recordingHandler.cntFilteredChildren( 0 ) == 2
+        generation = self.recordingHandler.filterGeneration
+
+        # an alias is no record levelname and does not filter
+        self.recordingHandler.levelNamesFilter["WARN"] = False
+        assert self.recordingHandler.filterGeneration > generation
+        assert self.recordingHandler.cntFilteredChildren( 0 ) == 2
+
+        self.recordingHandler.levelNamesFilter["DEBUG"] = False
+        assert self.recordingHandler.cntFilteredChildren( 1 ) == 0
+        assert self.recordingHandler.cntFilteredChildren( 1 ) == 0
+        assert not self.recordingHandler.passedFilterAt( 2 )
+
+        self.recordingHandler.levelNamesFilter["DEBUG"] = True
+        assert self.recordingHandler.cntFilteredChildren( 1 ) == 1
+
+    def test_RecordFilter( self ):
+        otherLogger = logging.getLogger('test.other')
+        initLogHierarchy( otherLogger )
+        self.fillLog()
+        self.recordingHandler.setRecordFilter( RecordFilter( messagePattern = "^2" ) )
+        assert self.recordingHandler.getFilteredChildren( None ) == [0]
+        assert self.recordingHandler.getFilteredChildren( 0 ) == [1], "Ancestors of a match stay visible"
+        assert self.recordingHandler.getFilteredChildren( 1 ) == [2]
+
+        self.recordingHandler.setRecordFilter( RecordFilter( loggerName = "test.other" ) |
+                                               RecordFilter( maxHierarchyStage = 0, messagePattern = "1" ) )
+        assert self.recordingHandler.getFilteredChildren( None ) == [4]
+        with EnterLowerLogHierarchyStage( "02", self.logger ):
+            lowerHierarchyStage( otherLogger )
+            otherLogger.warning( "12" )
+        resetLogHierarchy( otherLogger )
+        assert self.recordingHandler.getFilteredChildren( None ) == [4, 5]
+        assert self.recordingHandler.getFilteredChildren( 5 ) == [6]
+        assert self.recordingHandler.ancestorsRevealed
+
+        self.recordingHandler.setRecordFilter( None )
+        assert self.recordingHandler.getFilteredChildren( None ) == [0, 4, 5]
+
+    def test_findMessages( self ):
+        recordingHandler = RecordingHandler( 6, messageIndex = True )
+        self.logger.addHandler( recordingHandler )
+        self.logger.info( "connect timeout" )
+        with EnterLowerLogHierarchyStage( "request A", self.logger ):
+            self.logger.warning( "Timeout while reading" )
+            self.logger.info( "retry" )
+        with EnterLowerLogHierarchyStage( "request B", self.logger ):
+            self.logger.warning( "timed out, timeout 3s" )
+        self.logger.removeHandler( recordingHandler )
+
+        for handler in [ recordingHandler, self.recordingHandler ]:
+            assert handler.findMessages( "timeout" ) == [0, 2, 5]
+            assert handler.findMessages( "TIMEOUT reading" ) == [2]
+            assert handler.findMessages( "tim", prefix = True ) == [0, 2, 5]
+            assert handler.findMessages( "timeout", subtreeIdx = 4 ) == [5]
+            assert handler.nextMatch( "timeout", 2 ) == 5
+            assert handler.nextMatch( "timeout", 5 ) == None
+
+        self.logger.addHandler( recordingHandler )
+        self.logger.info( "no match" )
+        self.logger.removeHandler( recordingHandler )
+        assert recordingHandler.findMessages( "timeout" ) == [2, 5], "Evicted records are not found"
+        assert not "connect" in recordingHandler.messageIndex.postings
+
+    def test_idxAtTime( self ):
+        recordingHandler = RecordingHandler( 5 )
+        for created in [ 10.0, 20.0, 20.0, 30.0 ]:
+            recordingHandler.emit( logging.makeLogRecord( { 'created' : created, 'levelno' : logging.INFO,
+                                                            'hierarchyStage' : 0 } ) )
+        assert recordingHandler.createdMonotonic
+        assert recordingHandler.idxAtTime( 15 ) == 1
+        assert recordingHandler.idxAtTime( 20 ) == 1
+        assert recordingHandler.idxAtTime( 31 ) == None
+        assert list( recordingHandler.rangeBetween( 20, 30 ) ) == [1, 2, 3]
+
+        # out of order, e.g. read from several files
+        for created in [ 15.0, 40.0 ]:
+            recordingHandler.emit( logging.makeLogRecord( { 'created' : created, 'levelno' : logging.INFO,
+                                                            'hierarchyStage' : 0 } ) )
+        assert not recordingHandler.createdMonotonic
+        assert recordingHandler.idxAtTime( 11 ) == 4
+        assert recordingHandler.idxAtTime( 5 ) == 4, "Evicted records are skipped"
+        assert list( recordingHandler.rangeBetween( 15, 30 ) ) == [4, 1, 2, 3]
+        assert list( recordingHandler.rangeBetween( 11, float( 'inf' ) ) ) == [4, 1, 2, 3, 5], "Go to time walks these"
+
+        assert parseTime( "14:03:22", datetime( 2024, 5, 1, 9 ).timestamp() ) == \
+            datetime( 2024, 5, 1, 14, 3, 22 ).timestamp()
+        assert parseTime( "24-05-01 14:03:22,500" ) == datetime( 2024, 5, 1, 14, 3, 22, 500000 ).timestamp()
+        with pytest.raises( ValueError ):
+            parseTime( "later" )
+
+    def test_maxChildLevelNo( self ):
+        changed = []
+        self.recordingHandler.maxChildLevelChanged = lambda idx: changed.append( idx )
+        with EnterLowerLogHierarchyStage( "00", self.logger ):
+            with EnterLowerLogHierarchyStage( "10", self.logger ):
+                self.logger.warning( "20" )
+                self.logger.error( "21" )
+                self.logger.warning( "22" )
+            self.logger.critical( "11" )
+        self.logger.error( "01" )
+
+        assert [ record.maxChildLevelNo for record in self.recordingHandler.records ] == \
+            [ logging.CRITICAL, logging.ERROR, -1, -1, -1, -1, -1 ]
+        assert changed == [ 1, 0, 1, 0, 0 ], "Only raised aggregates are notified"
+        assert self.recordingHandler.subtreeMaxLevelNo( 1 ) == logging.ERROR
+        assert self.recordingHandler.subtreeMaxLevelNo( 2 ) == -1
+        assert self.recordingHandler.maxLevelNo( 2, 4 ) == logging.ERROR
+        assert self.recordingHandler.maxLevelNo( 0, 10 ) == logging.CRITICAL
+
+        rangeMaxTree = RangeMaxTree( 5 )
+        for slot, value in enumerate( [ 3, 9, 4, 1, 7 ] ):
+            rangeMaxTree.set( slot, value )
+        assert rangeMaxTree.max( 2, 3 ) == 4
+        assert rangeMaxTree.max( 4, 0 ) == 7, "Wraps around"
+        rangeMaxTree.set( 1, 0 )
+        assert rangeMaxTree.max( 0, 4 ) == 7
+
+    def test_subtreeEndAndNextSibling( self ):
+        self.fillLog()
+        assert self.recordingHandler.subtreeEndIdx( 0 ) == 3
+        assert self.recordingHandler.subtreeEndIdx( 1 ) == 2
+        assert self.recordingHandler.subtreeEndIdx( 2 ) == 2
+        assert self.recordingHandler.subtreeEndIdx( 4 ) == 4
+        assert self.recordingHandler.nextSiblingIdx( 0 ) == 4
+        assert self.recordingHandler.nextSiblingIdx( 1 ) == 3
+        assert self.recordingHandler.nextSiblingIdx( 2 ) == None
+        assert self.recordingHandler.nextSiblingIdx( 3 ) == None
+        assert self.recordingHandler.nextSiblingIdx( 4 ) == None
+        assert list( self.recordingHandler.children( None ) ) == [0, 4]
+        assert list( self.recordingHandler.children( 0 ) ) == [1, 3]
+
     def test_parentIdx( self ):
         self.fillLog()
         assert self.recordingHandler.parentIdx( 0 ) == None
@@ -162,6 +635,18 @@ class TestHierarchicalLog:
         assert self.recordingHandler.parentRecord( 3 ).message == "00"
         assert self.recordingHandler.parentRecord( 4 ) == None
 
+    def test_parentIdxEvicted( self ):
+        recordingHandler = RecordingHandler(4)
+        self.logger.addHandler(recordingHandler)
+        self.fillLog()
+        self.logger.removeHandler(recordingHandler)
+
+        assert recordingHandler.minIdx() == 1
+        assert recordingHandler.parentIdx( 1 ) == None, "Parent 0 was removed from buffer"
+        assert recordingHandler.parentIdx( 2 ) == 1
+        assert recordingHandler.parentIdx( 3 ) == None
+        assert recordingHandler.parentIdx( 4 ) == None
+
     # Test HierarchyFormatter
     # @unittest.skip("skipped temporarily")
     def test_HLogIO(self):
@@ -220,6 +705,238 @@ class TestHierarchicalLog:
             assert origRecord.hierarchyStage == readRecord.hierarchyStage
             assert origRecord.msg == readRecord.msg
 
+    def test_parseLine(self):
+        logFileReader = HLogFileReader( self.logger, '%(asctime)s - %(name)s - %(levelname)8s - %(message)s' )
+        entry = logFileReader.parseLine( "        |- 24-03-01 12:00:01 - a.b -  WARNING - deep - record\n" )
+        assert entry['hierarchyParser'] == 8, "Deeper than maxHierarchy"
+        assert entry['asctimeParser'] == time.mktime( time.strptime( "24-03-01 12:00:01", '%y-%m-%d %H:%M:%S' ) )
+        assert entry['levelnameParser'] == "WARNING"
+        assert entry['messageParser'] == "deep - record"
+        assert logFileReader.parseLine( "   |-continued\n" ) == { 'messageParser' : "   |-continued" }
+
+    def test_asctimeParser(self):
+        asctimeParser = HLogFileReader.asctimeParser()
+        for datefmt in [ '%y-%m-%d %H:%M:%S', '%d.%m.%Y %H:%M:%S %%', '%b %d %H:%M:%S' ]:
+            asctimeParser.setDateFormat( datefmt )
+            assert ( asctimeParser.fieldSlices is None ) == ( datefmt == '%b %d %H:%M:%S' ), "Fast path for numeric fields only"
+            for t in [ 1709290801, 1709290861, 1711846861, 1711850461 ]:
+                text = time.strftime( datefmt, time.localtime( t ) )
+                assert asctimeParser.value( text ) == time.mktime( time.strptime( text, datefmt ) )
+        asctimeParser.setDateFormat( '%y-%m-%d %H:%M:%S' )
+        asctimeParser.value( "24-03-01 12:00:01" )
+        with pytest.raises( ValueError ):
+            # checked within the cached hour as well
+            asctimeParser.value( "24-03-01 12:75:99" )
+        asctimeParser.setDateFormat( None )
+        assert asctimeParser.value( "2024-03-01 12:00:01,250" ) == time.mktime( time.strptime( "24-03-01 12:00:01", '%y-%m-%d %H:%M:%S' ) ) + 0.25
+
+        fmt = '%(asctime)s.%(msecs)03d - %(levelname)8s - %(message)s'
+        self.fileHandler.setFormatter( HLogFormatter( fmt, '%y-%m-%d %H:%M:%S' ) )
+        self.fillLog()
+        self.fileHandler.close()
+        recordingHandler = RecordingHandler()
+        HLogFileReader( None, fmt ).readParallel( self.logFile, recordingHandler, 1 )
+        for idx in range( self.recordingHandler.maxIdx() + 1 ):
+            assert recordingHandler.at( idx ).msecs == int( self.recordingHandler.at( idx ).msecs ), "Sub-second precision kept"
+            assert abs( recordingHandler.at( idx ).created - self.recordingHandler.at( idx ).created ) < 0.001
+
+    def test_follow(self):
+        followFile = os.path.join( self.workDir, 'testFollow.log' )
+        for path in [ followFile, followFile + '.1' ]:
+            if os.path.isfile( path ):
+                os.remove( path )
+        line = lambda hLevel, message : "%s|-%s 24-03-01 12:00:01 -     INFO - %s\n" % ( " "*hLevel, " "*(HLogIO.maxHierarchy-hLevel), message )
+        def write( text, mode = 'a' ):
+            with open( followFile, mode ) as f:
+                f.write( text )
+
+        followLogger = logging.getLogger( 'testFollow' )
+        initLogHierarchy( followLogger )
+        recordingHandler = RecordingHandler()
+        followLogger.addHandler( recordingHandler )
+        logFileReader = HLogFileReader( followLogger, '%(asctime)s - %(levelname)8s - %(message)s' )
+        truncated = []
+        logFileReader.fileTruncated = lambda filePath : truncated.append( filePath )
+
+        logFileReader.startFollow( followFile )
+        assert logFileReader.poll() == 0, "Not yet existing"
+        write( line( 0, "a" ) + line( 1, "b" ) )
+        assert logFileReader.poll() == 1, "b is held back"
+        write( line( 1, "c" )[:20] )
+        assert logFileReader.poll() == 0, "Partial line"
+        write( line( 1, "c" )[20:] + "   more of c\n" )
+        assert logFileReader.poll() == 1
+        assert logFileReader.poll() == 0, "Unchanged"
+
+        os.rename( followFile, followFile + '.1' )
+        write( line( 0, "d" ) + line( 0, "e" ) )
+        assert logFileReader.poll() == 2, "c of the rotated file and d"
+        assert recordingHandler.at( 2 ).getMessage() == "c\n   more of c"
+        assert recordingHandler.parentIdx( 2 ) == 0
+
+        write( line( 0, "f" ), 'w' )
+        assert logFileReader.poll() == 0
+        assert truncated == [ followFile ]
+        assert [ record.getMessage() for record in recordingHandler.records ] == [ "a", "b", "c\n   more of c", "d" ]
+
+        logFileReader.stopFollow()
+        followLogger.removeHandler( recordingHandler )
+        resetLogHierarchy( followLogger )
+
+    def test_HLogFileModel(self):
+        self.fileHandler.setFormatter( HLogFormatter('%(asctime)s - %(levelname)8s - %(message)s', '%y-%m-%d %H:%M:%S') )
+        self.fillLog()
+        with EnterLowerLogHierarchyStage( "02", self.logger ):
+            self.logger.error( "12\n   continued" )
+        self.fileHandler.close()
+
+        model = HLogFileModel( self.logFile, '%(asctime)s - %(levelname)8s - %(message)s' )
+        assert len( model.records.materialized ) == 0, "Nothing parsed by the scan"
+        assert model.filteredChildCnts.lazyItems is None and model.levelNos.lazyNodes is None, "Allocated on first use"
+        assert model.maxIdx() == self.recordingHandler.maxIdx()
+        for idx in range( model.maxIdx() + 1 ):
+            assert model.parentIdx( idx ) == self.recordingHandler.parentIdx( idx )
+            assert model.records.levelNoAt( idx ) == self.recordingHandler.at( idx ).levelno
+            assert model.records.createdAt( idx ) == int( self.recordingHandler.at( idx ).created )
+        assert model.getFilteredChildren( None ) == [0, 4, 5]
+        assert model.subtreeMaxLevelNo( 5 ) == logging.ERROR
+        assert len( model.records.materialized ) == 0
+        assert model.at( 6 ).getMessage() == self.recordingHandler.at( 6 ).getMessage()
+        assert model.records.templateAt( 6 ) == "#", "Numbers masked, first line only"
+        assert model.at( 5 ).maxChildLevelNo == logging.ERROR
+        assert len( model.records.materialized ) == 2
+        model.levelNamesFilter['WARNING'] = False
+        assert model.getFilteredChildren( None ) == [0, 5]
+        assert model.cntFilteredChildren( 5 ) == 1
+        assert model.maxLevelNo( 0, model.maxIdx() ) == logging.ERROR
+        model.close()
+
+    def test_readParallel(self):
+        fmt = '%(asctime)s - %(levelname)8s - %(message)s'
+        self.fileHandler.setFormatter( HLogFormatter( fmt, '%y-%m-%d %H:%M:%S' ) )
+        for i in range( 20 ):
+            with EnterLowerLogHierarchyStage( f"stage {i}", self.logger ):
+                self.logger.warning( f"record {i}\n  continued {i}" )
+        self.fileHandler.close()
+
+        logFileReader = HLogFileReader( None, fmt )
+        boundaries = logFileReader.chunkBoundaries( self.logFile, 7 )
+        assert boundaries[-1] == os.path.getsize( self.logFile )
+        with open( self.logFile, 'rb' ) as f:
+            content = f.read()
+        for boundary in boundaries[:-1]:
+            assert logFileReader.lineRe.match( content[ boundary : ].split( b'\n' )[0].decode() ), "Aligned to a record line"
+
+        recordingHandler = RecordingHandler()
+        assert logFileReader.readParallel( self.logFile, recordingHandler, 2, 7 ) == boundaries[-1]
+        assert [ record.getMessage() for record in recordingHandler.records ] == \
+            [ record.getMessage() for record in self.recordingHandler.records ]
+        assert recordingHandler.parentIdx( 39 ) == 38
+
+        model = HLogFileModel( self.logFile, fmt, maxWorkers = 2 )
+        sequentialModel = HLogFileModel( self.logFile, fmt )
+        assert model.records.columns()['offset'] == sequentialModel.records.columns()['offset']
+        assert model.at( 39 ).getMessage() == "record 19\n  continued 19"
+        model.close()
+        sequentialModel.close()
+
+    def test_readInto(self):
+        fmt = '%(asctime)s - %(levelname)8s - %(message)s'
+        self.fileHandler.setFormatter( HLogFormatter( fmt, '%y-%m-%d %H:%M:%S' ) )
+        self.fillLog()
+        with EnterLowerLogHierarchyStage( "02", self.logger ):
+            self.logger.error( "12\n   continued" )
+        self.fileHandler.close()
+
+        recordingHandler = RecordingHandler()
+        forwardHandler = RecordingHandler()
+        forwardHandler.setLevel( logging.WARNING )
+        logFileReader = HLogFileReader( None, fmt, recordingHandler = recordingHandler, handlers = [ forwardHandler ], batchSize = 3 )
+        assert logFileReader.read( self.logFile ) == os.path.getsize( self.logFile )
+        assert len( self.recordingHandler.records ) == 7, "Nothing logged by the test logger"
+        assert recordingHandler.maxIdx() == self.recordingHandler.maxIdx()
+        for idx in range( recordingHandler.maxIdx() + 1 ):
+            assert recordingHandler.parentIdx( idx ) == self.recordingHandler.parentIdx( idx )
+            assert recordingHandler.at( idx ).getMessage() == self.recordingHandler.at( idx ).getMessage()
+            assert recordingHandler.at( idx ).created == int( self.recordingHandler.at( idx ).created )
+        assert recordingHandler.at( 0 ).name == os.path.basename( self.logFile )
+        assert [ record.levelno for record in forwardHandler.records ] == \
+            [ record.levelno for record in self.recordingHandler.records if record.levelno >= logging.WARNING ]
+
+    def test_HLogFileModelSidecar(self):
+        fmt = '%(asctime)s - %(levelname)8s - %(message)s'
+        self.fileHandler.setFormatter( HLogFormatter( fmt, '%y-%m-%d %H:%M:%S' ) )
+        if os.path.isfile( self.logFile + '.hidx' ):
+            os.remove( self.logFile + '.hidx' )
+        def hierarchy( model ):
+            return [ ( model.parentIdx( idx ), model.subtreeEndIdx( idx ), model.nextSiblingIdx( idx ),
+                       model.subtreeMaxLevelNo( idx ), model.records.createdAt( idx ) ) for idx in range( model.maxIdx() + 1 ) ]
+
+        with EnterLowerLogHierarchyStage( "00", self.logger ):
+            self.logger.info( "10" )
+            lowerHierarchyStage( self.logger )
+            self.logger.info( "20" )
+            self.fileHandler.flush()
+            model = HLogFileModel( self.logFile, fmt )
+            assert model.cntLoaded == 0 and os.path.isfile( self.logFile + '.hidx' )
+            model.close()
+            model = HLogFileModel( self.logFile, fmt )
+            assert model.cntLoaded == 3, "Unchanged file"
+            model.close()
+
+            self.logger.error( "21\n  continued" )
+            raiseHierarchyStage( self.logger )
+            self.logger.info( "11" )
+        self.logger.info( "01" )
+        self.fileHandler.close()
+        model = HLogFileModel( self.logFile, fmt )
+        assert model.cntLoaded == 3, "Only the appended records are scanned"
+        scannedModel = HLogFileModel( self.logFile, fmt, sidecar = False )
+        assert hierarchy( model ) == hierarchy( scannedModel )
+        assert model.at( 0 ).maxChildLevelNo == logging.ERROR
+        assert model.at( 3 ).getMessage() == "21\n  continued"
+        model.close()
+        scannedModel.close()
+
+        with open( self.logFile, 'r+b' ) as f:
+            f.write( b'  ' )
+        model = HLogFileModel( self.logFile, fmt )
+        assert model.cntLoaded == 0, "Changed file"
+        model.close()
+
+    def test_compressedLog(self):
+        fmt = '%(asctime)s - %(levelname)8s - %(message)s'
+        self.fileHandler.setFormatter( HLogFormatter( fmt, '%y-%m-%d %H:%M:%S' ) )
+        compressedFiles = { compression : os.path.join( self.workDir, 'testCompressed.log.' + extension )
+                            for compression, extension in [ ( 'gzip', 'gz' ), ( 'xz', 'xz' ) ] }
+        compressedHandlers = [ HLogCompressedHandler( filePath, compression, 200 ) for compression, filePath in compressedFiles.items() ]
+        for handler in compressedHandlers:
+            handler.setFormatter( HLogFormatter( fmt, '%y-%m-%d %H:%M:%S' ) )
+            self.logger.addHandler( handler )
+        for i in range( 10 ):
+            with EnterLowerLogHierarchyStage( f"stage {i}", self.logger ):
+                self.logger.info( f"record {i}\n  continued" )
+        for handler in compressedHandlers:
+            self.logger.removeHandler( handler )
+            handler.close()
+        self.fileHandler.close()
+
+        with gzip.open( compressedFiles['gzip'], 'rt' ) as f:
+            assert f.readlines() == self.logFileContent( self.logFile ), "One valid gzip file"
+        logFileReader = HLogFileReader( None, fmt )
+        messages = [ record.getMessage() for record in self.recordingHandler.records ]
+        for filePath in compressedFiles.values():
+            assert [ entry['messageParser'] for entry in logFileReader.entries( filePath ) ] == messages
+            blockIndex = HLogBlockIndex.load( filePath )
+            assert len( blockIndex ) > 2
+            assert [ entry['messageParser'] for entry in logFileReader.entriesFrom( filePath, 13 ) ] == messages[13:]
+            assert len( list( logFileReader.entriesFrom( filePath, 20 ) ) ) == 0
+            assert len( list( logFileReader.entriesFrom( filePath, t = self.recordingHandler.at( 0 ).created ) ) ) == 20
+            assert [ entry['messageParser'] for entry in logFileReader.entriesFrom( filePath ) ] == messages, "Whole file"
+            blockNo = blockIndex.blockOfIdx( 13 )
+            assert [ entry['messageParser'] for entry in logFileReader.blockEntries( filePath, blockIndex, blockNo ) ] == \
+                messages[ blockIndex.firstIdxs[ blockNo ] : blockIndex.firstIdxs[ blockNo ] + blockIndex.cnts[ blockNo ] ]
+
 if __name__ == '__main__':
     import pytest, sys
     pytest.main([sys.argv[0], "-v"])
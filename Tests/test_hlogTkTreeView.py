@@ -0,0 +1,64 @@
+import pytest, tkinter, sys, os
+from datetime import datetime
+from tkinter import *
+from tkinter.ttk import *
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from hlog import *
+from hlog.hlogTextTkTreeView import *
+
+class TestHlogTkTreeView():
+    def setup_method(self):
+        self.Root = Tk()
+        self.Root.geometry("-3100+0")
+
+        self.logger = logging.getLogger('testTreeView')
+        self.logger.setLevel(logging.DEBUG)
+        initLogHierarchy(self.logger)
+
+        self.treeView = HLogTextTkTreeView( self.Root, self.logger, '%(message)s' )
+        self.treeView.pack(fill=BOTH, expand=True)
+        self.logger.addHandler(self.treeView)
+        self.Root.update()
+        self.fillLog()
+
+    def teardown_method(self):
+        self.logger.removeHandler( self.treeView )
+        resetLogHierarchy(self.logger)
+        self.treeView.destroy()
+        self.Root.destroy()
+
+    def fillLog(self):
+        with EnterLowerLogHierarchyStage( "00", self.logger ) :
+            with EnterLowerLogHierarchyStage( "10", self.logger ) :
+                self.logger.debug("20")
+            self.logger.warning("11")
+        self.logger.error("01")
+
+    def collapse(self, idx):
+        """ collapses a record like the user does """
+        self.treeView.logTextTree.selection_set( idx )
+        self.treeView.onClose( None )
+
+    def test_goToTimeIntoCollapsed( self ):
+        tree = self.treeView.logTextTree
+        assert self.treeView.showIdx( 2 )
+        self.collapse( 1 )
+        self.collapse( 0 )
+        assert tree.exists( 2 ), "Collapsed children are kept as items"
+
+        self.treeView.timeEntry.insert( 0, datetime.fromtimestamp( self.treeView.at( 2 ).created ).strftime( '%H:%M:%S.%f' ) )
+        self.treeView.goToTime()
+        assert tree.item( 0 )['open'] and tree.item( 1 )['open']
+        assert tree.selection()[0] in ( '1', '2' ), "Record of the time or its predecessor of the same microsecond"
+        assert tree.get_children( 0 ) == ( '1', '3' )
+
+    def test_searchNextIntoCollapsed( self ):
+        tree = self.treeView.logTextTree
+        assert self.treeView.showIdx( 2 )
+        self.collapse( 0 )
+
+        self.treeView.searchEntry.insert( 0, "20" )
+        self.treeView.searchNext()
+        assert tree.selection()[0] == '2'
+        assert tree.get_children( 1 ) == ( '2', )
@@ -1,37 +1,90 @@
 from enum import Enum
-from collections import deque
+from array import array
 import logging
+import logging.handlers
+import queue
 import re
 from datetime import datetime
-import copy
 import time
+import os
+import sys
+import threading
+import collections.abc
+import contextvars
+import bisect
+import heapq
+import functools
+import inspect
+import json
+import struct
+import mmap
+import tempfile
+import shutil
+import concurrent.futures
+import itertools
+import hashlib
+import gzip
+import lzma
+import io
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 formerLogFactory = None
+slimRecordsInstalled = False
 initializedLoggers : set[str] = set()
-
-def initLogHierarchy(logger: logging.Logger = logging.getLogger()):
+cachedLoggers : dict[str, logging.Logger] = {}
+"""loggers by name, to spare logging.getLogger with its module lock for every record"""
+hierarchyStageOffsets : dict[str, contextvars.ContextVar[int]] = {}
+"""
+per logger name the offset of lowerHierarchyStage/raiseHierarchyStage calls to logger.hierarchyStage,
+kept in a context variable, so every thread and every asyncio task nests its records independently
+"""
+
+def cachedLogger( name : str ) -> logging.Logger:
+    logger = cachedLoggers.get( name )
+    if logger is None:
+        logger = cachedLoggers[ name ] = logging.getLogger( name )
+    return logger
+
+def initLogHierarchy(logger: logging.Logger = logging.getLogger(), slimRecords : bool = False):
     """
     initialises the log hierarchy for python logger
       add member hierarchyStage and init its value to 0
       lower hierachy stages have higher numbers
       after initLogHierarchy log entries will be created with member hierachyStage set from the current hierachy level
       of the logger
+    with slimRecords the records are created as SlimHLogRecord, bypassing a formerly installed record factory,
+    the record factory is shared by all initialised loggers, so slimRecords has to be the same for all of them
     """
     global formerLogFactory
+    global slimRecordsInstalled
     
     assert not logger.name in initializedLoggers
+    assert not formerLogFactory or slimRecords == slimRecordsInstalled, \
+        "All initialised loggers have to use the same kind of records!"
 
     logger.hierarchyStage = 0
+    hierarchyStageOffset( logger ).set( 0 )
     initializedLoggers.add( logger.name )
 
     if not formerLogFactory:
         formerLogFactory = logging.getLogRecordFactory()
+        slimRecordsInstalled = slimRecords
 
-        def logFactory(*args, **kwargs):
-            logger = logging.getLogger( args[0] )
-            record : HLogRecord = formerLogFactory(*args, **kwargs)
-            record.hierarchyStage = __getHierarchyStage(logger)
-            return record
+        if slimRecords:
+            def logFactory(name, level, fn, lno, msg, args, exc_info, func=None, sinfo=None, **kwargs):
+                record = SlimHLogRecord(name, level, fn, lno, msg, args, exc_info, func, sinfo)
+                record.hierarchyStage = __getHierarchyStage( cachedLogger( name ) )
+                return record
+        else:
+            def logFactory(*args, **kwargs):
+                logger = cachedLogger( args[0] )
+                record : HLogRecord = formerLogFactory(*args, **kwargs)
+                record.hierarchyStage = __getHierarchyStage(logger)
+                return record
 
         logging.setLogRecordFactory(logFactory)
 
@@ -49,22 +102,93 @@ def resetLogHierarchy(logger: logging.Logger = logging.getLogger()):
     if not len(initializedLoggers):
         logging.setLogRecordFactory(formerLogFactory)
         formerLogFactory = None
+        cachedLoggers.clear()
 
 def __getHierarchyStage(logger):
     try:
-        return logger.hierarchyStage
+        hierarchyStage = logger.hierarchyStage
     except:
         logger.hierarchyStage = -1
         return -1
-    
+    offset = hierarchyStageOffsets.get( logger.name )
+    if offset is None:
+        return hierarchyStage
+    return hierarchyStage + offset.get()
+
+def hierarchyStageOffset(logger: logging.Logger) -> contextvars.ContextVar[int]:
+    """ retrieves the context variable holding the hierarchy stage offset of the logger """
+    offset = hierarchyStageOffsets.get( logger.name )
+    if offset is None:
+        offset = hierarchyStageOffsets[ logger.name ] = \
+            contextvars.ContextVar( f"hierarchyStageOffset.{logger.name}", default = 0 )
+    return offset
+
+def getHierarchyStage(logger: logging.Logger = logging.getLogger()) -> int:
+    """ retrieves the hierarchy stage of the logger valid for the current thread or asyncio task """
+    return __getHierarchyStage(logger)
+
 def lowerHierarchyStage(logger: logging.Logger = logging.getLogger()):
-    """ lowers the level of hierarchy """
-    logger.hierarchyStage += 1
+    """ lowers the level of hierarchy for the current thread or asyncio task """
+    offset = hierarchyStageOffset( logger )
+    offset.set( offset.get() + 1 )
 
 def raiseHierarchyStage(logger = logging.getLogger()):
-    """ raises level of hierarchy """
-    assert logger.hierarchyStage > 0, "Hierarchy stage must be greater 0 for this!"
-    logger.hierarchyStage -= 1
+    """ raises level of hierarchy for the current thread or asyncio task """
+    assert getHierarchyStage( logger ) > 0, "Hierarchy stage must be greater 0 for this!"
+    offset = hierarchyStageOffset( logger )
+    offset.set( offset.get() - 1 )
+
+def parseTime(text : str, referenceTime : float | None = None) -> float:
+    """
+    Parses a local time like '2024-05-01 14:03:22', '24-05-01 14:03:22' or '14:03:22',
+    optionally with milliseconds after ',' or '.', a time without date is taken at the day of referenceTime
+    raises ValueError if text is not a time
+    """
+    text = text.strip()
+    fraction = 0.0
+    match = re.fullmatch( r'(.*\d:\d\d)[,.](\d+)', text )
+    if match:
+        text = match.group( 1 )
+        fraction = float( '0.' + match.group( 2 ) )
+    for format in ( '%Y-%m-%d %H:%M:%S', '%y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%y-%m-%d %H:%M' ):
+        try:
+            return datetime.strptime( text, format ).timestamp() + fraction
+        except ValueError:
+            pass
+    for format in ( '%H:%M:%S', '%H:%M' ):
+        try:
+            clock = datetime.strptime( text, format )
+        except ValueError:
+            continue
+        day = datetime.fromtimestamp( time.time() if referenceTime is None else referenceTime )
+        return day.replace( hour=clock.hour, minute=clock.minute, second=clock.second, microsecond=0 ).timestamp() + fraction
+    raise ValueError( "no time: '%s'" % text )
+
+def createdMsecs(created : float) -> float:
+    """
+    The msecs of a record restored from its created time, rounded to microseconds first,
+    so a created time of whole milliseconds isn't truncated to the millisecond below
+    """
+    return int( round( created - int( created ), 6 ) * 1000 ) + 0.0
+
+class HLogSpan():
+    """
+    enter and exit time in perf_counter_ns of a lowered hierarchy stage,
+    attached as span to the record opening the stage, exitNs is None while the stage is open
+    """
+    __slots__ = ( 'enterNs', 'exitNs' )
+
+    def __init__(self)->None:
+        self.enterNs = time.perf_counter_ns()
+        self.exitNs = None
+
+    def close(self)->None:
+        self.exitNs = time.perf_counter_ns()
+
+    def durationNs(self)->int | None:
+        if self.exitNs is None:
+            return None
+        return self.exitNs - self.enterNs
 
 class EnterLowerLogHierarchyStage():
     """
@@ -74,17 +198,29 @@ class EnterLowerLogHierarchyStage():
         logger.info("something with already lowered log hierarchy stage here")
     
     logger.info("something with again raised hierarchy stage here")
+
+    within coroutines "async with" can be used as well
+    the stage is lowered only for the current thread or asyncio task
+    the message record gets a HLogSpan with the enter and exit time of the block
     """
     def __init__(self, msg: str, logger: logging.Logger = logging.getLogger() ):
         assert isinstance( msg, str ),  "Arg msg has to be of type str!"
         self.logger = logger
-        self.logger.info( msg )
+        self.span = HLogSpan()
+        self.logger.info( msg, extra={ 'span' : self.span } )
 
     def __enter__(self):
         lowerHierarchyStage(self.logger)
 
     def __exit__(self ,type, value, traceback):
         raiseHierarchyStage( self.logger )
+        self.span.close()
+
+    async def __aenter__(self):
+        self.__enter__()
+
+    async def __aexit__(self ,type, value, traceback):
+        self.__exit__( type, value, traceback )
 
 # 
 class HLogRecord( logging.LogRecord ):
@@ -99,38 +235,978 @@ class HLogRecord( logging.LogRecord ):
         self.hierarchyStage = -1 
         """the lower the number is, the higher in hierarchy"""
 
+class SlimHLogRecord( HLogRecord ):
+    """
+    A low overhead HLogRecord, used by the record factory if initLogHierarchy was called with slimRecords
+    the hierarchy members are declared as slots, the fields in skippedFields are not retrieved but set to None
+    the standard fields stay in __dict__, because the formatters are using it
+    """
+    __slots__ = ( 'idx', 'hierarchyStage', 'showSubrecords', 'maxChildLevelNo' )
+
+    skippedFields : frozenset[str] = frozenset( [ 'processName', 'threadName' ] )
+    """may contain processName, threadName, thread, process and taskName"""
+
+    fileNames : dict[str, tuple[str,str]] = {}
+    """filename and module by pathname"""
+
+    hasTaskName = hasattr( logging, 'logAsyncioTasks' )
+    """taskName exists since python 3.12"""
+
+    def __init__(self, name, level, pathname, lineno, msg, args, exc_info, func=None, sinfo=None, **kwargs):
+        created = time.time()
+        if (args and len(args) == 1 and isinstance(args[0], collections.abc.Mapping) and args[0]):
+            args = args[0]
+        fileName = SlimHLogRecord.fileNames.get( pathname )
+        if fileName is None:
+            try:
+                fileName = os.path.basename(pathname)
+                fileName = (fileName, os.path.splitext(fileName)[0])
+            except (TypeError, ValueError, AttributeError):
+                fileName = (pathname, "Unknown module")
+            SlimHLogRecord.fileNames[ pathname ] = fileName
+
+        skippedFields = self.skippedFields
+        thread = threadName = processName = process = taskName = None
+        if logging.logThreads:
+            if not 'thread' in skippedFields:
+                thread = threading.get_ident()
+            if not 'threadName' in skippedFields:
+                threadName = threading.current_thread().name
+        if logging.logMultiprocessing and not 'processName' in skippedFields:
+            processName = 'MainProcess'
+            mp = sys.modules.get('multiprocessing')
+            if mp is not None:
+                try:
+                    processName = mp.current_process().name
+                except Exception:
+                    pass
+        if logging.logProcesses and not 'process' in skippedFields:
+            process = os.getpid()
+        if SlimHLogRecord.hasTaskName and logging.logAsyncioTasks and not 'taskName' in skippedFields:
+            asyncio = sys.modules.get('asyncio')
+            if asyncio:
+                try:
+                    taskName = asyncio.current_task().get_name()
+                except Exception:
+                    pass
+
+        # filling __dict__ at once is much faster than setting the attributes one by one
+        self.__dict__ = { 'name' : name, 'msg' : msg, 'args' : args,
+                          'levelname' : logging.getLevelName(level), 'levelno' : level,
+                          'pathname' : pathname, 'filename' : fileName[0], 'module' : fileName[1],
+                          'exc_info' : exc_info, 'exc_text' : None, 'stack_info' : sinfo,
+                          'lineno' : lineno, 'funcName' : func, 'created' : created,
+                          'msecs' : int((created - int(created)) * 1000) + 0.0,
+                          'relativeCreated' : (created - logging._startTime) * 1000,
+                          'thread' : thread, 'threadName' : threadName, 'processName' : processName,
+                          'process' : process, 'taskName' : taskName }
+
+        self.idx = -1
+        self.hierarchyStage = -1
+        self.showSubrecords = None
+        self.maxChildLevelNo = -1
+
+def makeHLogRecord( fields : dict[str,any] )->HLogRecord:
+    """
+    Like logging.makeLogRecord, but always creates a HLogRecord instead of using the record factory,
+    the slots of a SlimHLogRecord would hide the hierarchy fields set in __dict__
+    """
+    record = HLogRecord.__new__( HLogRecord )
+    logging.LogRecord.__init__( record, None, None, "", 0, "", (), None, None )
+    record.__dict__.update( fields )
+    return record
+
 class LowerLogHierarchyStage():
     """
     lowers the log hierarchy stage and automatically raises on leaving the function context
     usage:
     def function():
-       lowerHierachyStage = LowerLogHierarchyStage( "Message text with previous log hierarchy stage here", logger ) :
+       lowerHierachyStage = LowerLogHierarchyStage( logger, "Message text with previous log hierarchy stage here" )
        logger.info("something with already lowered log hierarchy stage here")
     logger.info("something with again raised hierarchy stage here")
+
+    if msg is given, it is logged with a HLogSpan closed on leaving the function context
     """
-    def __init__(self, logger: logging.Logger = logging.getLogger() ):
+    def __init__(self, logger: logging.Logger = logging.getLogger(), msg: str | None = None ):
         self.logger = logger
+        self.span = None
+        if msg is not None:
+            self.span = HLogSpan()
+            self.logger.info( msg, extra={ 'span' : self.span } )
         lowerHierarchyStage(self.logger)
 
     def __del__(self ):
         raiseHierarchyStage( self.logger )
+        if self.span is not None:
+            self.span.close()
+
+def logHierarchyStage(logger: logging.Logger = logging.getLogger(), msg: str | None = None ):
+    """
+    decorator, runs the function in an EnterLowerLogHierarchyStage block, so every call is logged as timed span
+    msg defaults to the qualified name of the function, works for coroutine functions as well
+    usage:
+    @logHierarchyStage( logger )
+    def function():
+        logger.info("something with already lowered log hierarchy stage here")
+    """
+    def decorator( function ):
+        spanMsg = function.__qualname__ if msg is None else msg
+        if inspect.iscoroutinefunction( function ):
+            @functools.wraps( function )
+            async def asyncWrapper( *args, **kwargs ):
+                async with EnterLowerLogHierarchyStage( spanMsg, logger ):
+                    return await function( *args, **kwargs )
+            return asyncWrapper
+
+        @functools.wraps( function )
+        def wrapper( *args, **kwargs ):
+            with EnterLowerLogHierarchyStage( spanMsg, logger ):
+                return function( *args, **kwargs )
+        return wrapper
+    return decorator
+
+class RingBuffer():
+    """
+    fixed capacity circular buffer over a preallocated list, or a typed array if a typecode is given
+    entries are accessed by their relative idx (0 is the oldest one) in O(1),
+    appending to a full buffer overwrites the oldest entry
+    """
+
+    def __init__(self, capacity : int, typecode : str = None, default = None )->None:
+        self.capacity = capacity
+        self.typecode = typecode
+        self.default = default
+        self.head = 0
+        """slot of the oldest entry"""
+        self.count = 0
+        self.items = self.allocate()
+
+    def allocate(self):
+        if self.typecode is None:
+            return [ self.default ] * self.capacity
+        return array( self.typecode, [ self.default ] ) * self.capacity
+
+    def append(self, item)->None:
+        """Appends an item, overwrites the oldest one if full"""
+        if self.count < self.capacity:
+            self.items[ (self.head + self.count) % self.capacity ] = item
+            self.count += 1
+        else:
+            self.items[ self.head ] = item
+            self.head = (self.head + 1) % self.capacity
+
+    def slot(self, relIdx : int)->int:
+        if relIdx < 0:
+            relIdx += self.count
+        if relIdx < 0 or relIdx >= self.count:
+            raise IndexError( "RingBuffer index out of range" )
+        return (self.head + relIdx) % self.capacity
+
+    def __getitem__(self, relIdx : int):
+        return self.items[ self.slot( relIdx ) ]
+
+    def __setitem__(self, relIdx : int, item)->None:
+        self.items[ self.slot( relIdx ) ] = item
+
+    def __len__(self)->int:
+        return self.count
+
+    def __iter__(self):
+        for relIdx in range( self.count ):
+            yield self.items[ (self.head + relIdx) % self.capacity ]
+
+    def ordered(self):
+        """Retrieves a copy of all entries, the oldest first"""
+        end = self.head + self.count
+        if end <= self.capacity:
+            return self.items[ self.head : end ]
+        return self.items[ self.head : ] + self.items[ : end - self.capacity ]
+
+    def clear(self)->None:
+        self.head = 0
+        self.count = 0
+        self.items = self.allocate()
+
+class RangeMaxTree():
+    """
+    segment tree over the slots of RingBuffers with the same capacity, retrieves the max of a slot range in O(log n)
+    a set walks up only as long as the maxima change
+    """
+
+    def __init__(self, capacity : int, default : int = -1 )->None:
+        self.capacity = capacity
+        self.default = default
+        self.size = 1
+        while self.size < capacity:
+            self.size *= 2
+        self.clear()
+
+    def set(self, slot : int, value : int)->None:
+        pos = slot + self.size
+        self.nodes[ pos ] = value
+        pos //= 2
+        while pos:
+            value = max( self.nodes[ 2 * pos ], self.nodes[ 2 * pos + 1 ] )
+            if self.nodes[ pos ] == value:
+                break
+            self.nodes[ pos ] = value
+            pos //= 2
+
+    def max(self, fromSlot : int, toSlot : int)->int:
+        """Retrieves the max from fromSlot to toSlot inclusive, wrapping around the end for toSlot < fromSlot"""
+        if toSlot < fromSlot:
+            return max( self.max( fromSlot, self.capacity - 1 ), self.max( 0, toSlot ) )
+        result = self.default
+        low = fromSlot + self.size
+        high = toSlot + self.size + 1
+        while low < high:
+            if low & 1:
+                result = max( result, self.nodes[ low ] )
+                low += 1
+            if high & 1:
+                high -= 1
+                result = max( result, self.nodes[ high ] )
+            low //= 2
+            high //= 2
+        return result
+
+    def build(self, values : collections.abc.Sequence[int] )->None:
+        """Sets the values of the slots from 0 at once"""
+        self.nodes[ self.size : self.size + len( values ) ] = array( 'i', values )
+        for pos in range( self.size - 1, 0, -1 ):
+            self.nodes[ pos ] = max( self.nodes[ 2 * pos ], self.nodes[ 2 * pos + 1 ] )
+
+    def clear(self)->None:
+        self.nodes = array( 'i', [ self.default ] ) * ( 2 * self.size )
+
+class LazyRingBuffer( RingBuffer ):
+    """RingBuffer allocating its items on first access, for columns which are possibly never used"""
+
+    def allocate(self):
+        return None
+
+    @property
+    def items(self):
+        if self.lazyItems is None:
+            self.lazyItems = RingBuffer.allocate( self )
+        return self.lazyItems
+
+    @items.setter
+    def items(self, items)->None:
+        self.lazyItems = items
+
+class LazyRangeMaxTree( RangeMaxTree ):
+    """RangeMaxTree built from values on first access"""
+
+    def __init__(self, capacity : int, default : int = -1 )->None:
+        self.values : collections.abc.Sequence[int] = []
+        RangeMaxTree.__init__( self, capacity, default )
+
+    @property
+    def nodes(self)->array:
+        if self.lazyNodes is None:
+            self.lazyNodes = array( 'i', [ self.default ] ) * ( 2 * self.size )
+            self.build( self.values )
+        return self.lazyNodes
+
+    @nodes.setter
+    def nodes(self, nodes : array)->None:
+        self.lazyNodes = nodes
+
+    def clear(self)->None:
+        self.lazyNodes = None
+
+class RecordStore( RingBuffer ):
+    """
+    stores the records itself in a RingBuffer
+    the accessors for the indexed record fields are shared with ColumnarRecordStore
+    """
+
+    def hierarchyStageAt(self, relIdx : int)->int:
+        return self[ relIdx ].hierarchyStage
+
+    def levelNoAt(self, relIdx : int)->int:
+        return self[ relIdx ].levelno
+
+    def createdAt(self, relIdx : int)->float:
+        return self[ relIdx ].created
+
+    def loggerNameAt(self, relIdx : int)->str:
+        return self[ relIdx ].name
+
+    def setMaxChildLevelNo(self, relIdx : int, maxChildLevelNo : int)->None:
+        self[ relIdx ].maxChildLevelNo = maxChildLevelNo
+
+    def templateAt(self, relIdx : int)->str:
+        return str( self[ relIdx ].msg )
+
+    def spanAt(self, relIdx : int)->HLogSpan | None:
+        return getattr( self[ relIdx ], 'span', None )
+
+    def messageAt(self, relIdx : int)->str:
+        return self[ relIdx ].getMessage()
+
+    def columns(self)->dict[str,any]:
+        """Retrieves the indexed record fields column wise, the oldest first"""
+        loggerNames = StringTable()
+        messages = StringTable()
+        columns = { 'levelno' : array( 'i' ), 'hierarchyStage' : array( 'i' ), 'created' : array( 'd' ),
+                    'loggerNameId' : array( 'i' ), 'messageId' : array( 'i' ) }
+        for record in self:
+            columns['levelno'].append( record.levelno )
+            columns['hierarchyStage'].append( record.hierarchyStage )
+            columns['created'].append( record.created )
+            columns['loggerNameId'].append( loggerNames.acquire( record.name ) )
+            columns['messageId'].append( messages.acquire( record.getMessage() ) )
+        columns['loggerNames'] = loggerNames.strings
+        columns['messages'] = messages.strings
+        return columns
+
+class StringTable():
+    """
+    reference counted table of unique strings, ids of released strings are reused
+    """
+
+    def __init__(self)->None:
+        self.strings : list[str | None] = []
+        self.refCnts = array( 'q' )
+        self.ids : dict[str,int] = {}
+        self.freeIds : list[int] = []
+
+    def acquire(self, text : str)->int:
+        """Retrieves the id for text and increments its reference count"""
+        id = self.ids.get( text )
+        if id is None:
+            if len( self.freeIds ):
+                id = self.freeIds.pop()
+                self.strings[ id ] = text
+            else:
+                id = len( self.strings )
+                self.strings.append( text )
+                self.refCnts.append( 0 )
+            self.ids[ text ] = id
+        self.refCnts[ id ] += 1
+        return id
+
+    def release(self, id : int)->None:
+        """Decrements the reference count of id, removes its string if unreferenced"""
+        self.refCnts[ id ] -= 1
+        if self.refCnts[ id ] == 0:
+            del self.ids[ self.strings[ id ] ]
+            self.strings[ id ] = None
+            self.freeIds.append( id )
+
+    def __getitem__(self, id : int)->str:
+        return self.strings[ id ]
+
+    def __len__(self)->int:
+        return len( self.ids )
+
+    def clear(self)->None:
+        self.__init__()
+
+class ColumnarRecordStore():
+    """
+    stores the displayed fields of the records in typed columns instead of LogRecord objects,
+    logger names and messages are kept once in a string table, the message templates in the one of the messages
+    records are materialized on access and kept until they are removed from the store,
+    so it saves memory for headless recording, where only a few records are accessed
+    """
+
+    def __init__(self, capacity : int)->None:
+        self.capacity = capacity
+        self.levelNos = RingBuffer( capacity, 'i', 0 )
+        self.hierarchyStages = RingBuffer( capacity, 'i', 0 )
+        self.createds = RingBuffer( capacity, 'd', 0.0 )
+        self.loggerNameIds = RingBuffer( capacity, 'i', -1 )
+        self.messageIds = RingBuffer( capacity, 'i', -1 )
+        self.templateIds = RingBuffer( capacity, 'i', -1 )
+        self.maxChildLevelNos = RingBuffer( capacity, 'i', -1 )
+        self.loggerNames = StringTable()
+        self.messages = StringTable()
+        self.materialized : dict[int, HLogRecord] = {}
+        self.spans : dict[int, HLogSpan] = {}
+        """spans of the records opening a hierarchy stage by idx"""
+        self.entireAdded = 0
+
+    def append(self, record : HLogRecord)->None:
+        if len( self.levelNos ) == self.capacity:
+            self.loggerNames.release( self.loggerNameIds[0] )
+            self.messages.release( self.messageIds[0] )
+            self.messages.release( self.templateIds[0] )
+            self.materialized.pop( self.entireAdded - self.capacity, None )
+            self.spans.pop( self.entireAdded - self.capacity, None )
+
+        span = getattr( record, 'span', None )
+        if span is not None:
+            self.spans[ self.entireAdded ] = span
+
+        message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException( record.exc_info )
+        if record.exc_text:
+            message += '\n' + record.exc_text
+
+        self.levelNos.append( record.levelno )
+        self.hierarchyStages.append( record.hierarchyStage )
+        self.createds.append( record.created )
+        self.loggerNameIds.append( self.loggerNames.acquire( record.name ) )
+        self.messageIds.append( self.messages.acquire( message ) )
+        self.templateIds.append( self.messages.acquire( str( record.msg ) ) )
+        self.maxChildLevelNos.append( -1 )
+        self.entireAdded += 1
+
+    def materialize(self, relIdx : int)->HLogRecord:
+        created = self.createds[ relIdx ]
+        levelNo = self.levelNos[ relIdx ]
+        message = self.messages[ self.messageIds[ relIdx ] ]
+        return makeHLogRecord( { 'name' : self.loggerNames[ self.loggerNameIds[ relIdx ] ],
+                                        'levelno' : levelNo, 'levelname' : logging.getLevelName( levelNo ),
+                                        'msg' : message, 'message' : message, 'args' : None,
+                                        'created' : created, 'msecs' : createdMsecs( created ),
+                                        'relativeCreated' : (created - logging._startTime) * 1000,
+                                        'hierarchyStage' : self.hierarchyStages[ relIdx ],
+                                        'idx' : self.entireAdded - len( self ) + relIdx,
+                                        'showSubrecords' : None,
+                                        'maxChildLevelNo' : self.maxChildLevelNos[ relIdx ],
+                                        'span' : self.spanAt( relIdx ) } )
+
+    def __getitem__(self, relIdx : int)->HLogRecord:
+        if relIdx < 0:
+            relIdx += len( self )
+        if relIdx < 0 or relIdx >= len( self ):
+            raise IndexError( "ColumnarRecordStore index out of range" )
+        idx = self.entireAdded - len( self ) + relIdx
+        record = self.materialized.get( idx )
+        if record is None:
+            record = self.materialize( relIdx )
+            self.materialized[ idx ] = record
+        return record
+
+    def __len__(self)->int:
+        return len( self.levelNos )
+
+    def __iter__(self):
+        for relIdx in range( len( self ) ):
+            yield self[ relIdx ]
+
+    def hierarchyStageAt(self, relIdx : int)->int:
+        return self.hierarchyStages[ relIdx ]
+
+    def levelNoAt(self, relIdx : int)->int:
+        return self.levelNos[ relIdx ]
+
+    def createdAt(self, relIdx : int)->float:
+        return self.createds[ relIdx ]
+
+    def loggerNameAt(self, relIdx : int)->str:
+        return self.loggerNames[ self.loggerNameIds[ relIdx ] ]
+
+    def setMaxChildLevelNo(self, relIdx : int, maxChildLevelNo : int)->None:
+        self.maxChildLevelNos[ relIdx ] = maxChildLevelNo
+        record = self.materialized.get( self.entireAdded - len( self ) + relIdx )
+        if record is not None:
+            record.maxChildLevelNo = maxChildLevelNo
+
+    def templateAt(self, relIdx : int)->str:
+        return self.messages[ self.templateIds[ relIdx ] ]
+
+    def spanAt(self, relIdx : int)->HLogSpan | None:
+        return self.spans.get( self.entireAdded - len( self ) + relIdx )
+
+    def messageAt(self, relIdx : int)->str:
+        return self.messages[ self.messageIds[ relIdx ] ]
+
+    def columns(self)->dict[str,any]:
+        """Retrieves the columns, the oldest first"""
+        return { 'levelno' : self.levelNos.ordered(), 'hierarchyStage' : self.hierarchyStages.ordered(),
+                 'created' : self.createds.ordered(), 'loggerNameId' : self.loggerNameIds.ordered(),
+                 'messageId' : self.messageIds.ordered(), 'templateId' : self.templateIds.ordered(),
+                 'loggerNames' : list( self.loggerNames.strings ), 'messages' : list( self.messages.strings ) }
+
+    def clear(self)->None:
+        for column in [ self.levelNos, self.hierarchyStages, self.createds, self.loggerNameIds, self.messageIds,
+                        self.templateIds, self.maxChildLevelNos ]:
+            column.clear()
+        self.loggerNames.clear()
+        self.messages.clear()
+        self.materialized.clear()
+        self.spans.clear()
+        self.entireAdded = 0
+
+class SpillSegment():
+    """
+    file pair of a RecordSpill, fixed size entries in the .idx file, logger names and messages in the .dat file
+    appended by writing, read by memory mapping, the links of an entry are updated in place
+    """
+
+    entryStruct = struct.Struct( '<iidqqqQII' )
+    """levelno, hierarchyStage, created, parentIdx, subtreeEndIdx, nextSiblingIdx, textOffset, nameLen, messageLen"""
+    linksOffset = 16
+
+    def __init__(self, path : str, firstIdx : int )->None:
+        self.path = path
+        self.firstIdx = firstIdx
+        self.cnt = 0
+        self.idxFile = open( path + '.idx', 'w+b', buffering=0 )
+        self.datFile = open( path + '.dat', 'w+b', buffering=0 )
+        self.datSize = 0
+        self.idxMap = None
+        self.datMap = None
+
+    def size(self)->int:
+        return self.cnt * self.entryStruct.size + self.datSize
+
+    def append(self, levelNo : int, hierarchyStage : int, created : float, parentIdx : int, subtreeEndIdx : int,
+               nextSiblingIdx : int, name : str, message : str )->None:
+        nameBytes = name.encode( 'utf-8' )
+        messageBytes = message.encode( 'utf-8' )
+        self.idxFile.write( self.entryStruct.pack( levelNo, hierarchyStage, created, parentIdx, subtreeEndIdx,
+                                                   nextSiblingIdx, self.datSize, len( nameBytes ),
+                                                   len( messageBytes ) ) )
+        self.datFile.write( nameBytes + messageBytes )
+        self.datSize += len( nameBytes ) + len( messageBytes )
+        self.cnt += 1
+
+    def mapped(self, fileMap, file, size : int ):
+        """Retrieves a map of file covering size, remaps the grown file"""
+        if fileMap is None or len( fileMap ) < size:
+            if fileMap is not None:
+                fileMap.close()
+            fileMap = mmap.mmap( file.fileno(), 0, access=mmap.ACCESS_READ )
+        return fileMap
+
+    def entry(self, idx : int )->tuple:
+        offset = ( idx - self.firstIdx ) * self.entryStruct.size
+        self.idxMap = self.mapped( self.idxMap, self.idxFile, offset + self.entryStruct.size )
+        return self.entryStruct.unpack_from( self.idxMap, offset )
+
+    def texts(self, idx : int )->tuple[str,str]:
+        entry = self.entry( idx )
+        textOffset, nameLen, messageLen = entry[6:9]
+        if nameLen + messageLen == 0:
+            return '', ''
+        self.datMap = self.mapped( self.datMap, self.datFile, textOffset + nameLen + messageLen )
+        name = self.datMap[ textOffset : textOffset + nameLen ].decode( 'utf-8' )
+        message = self.datMap[ textOffset + nameLen : textOffset + nameLen + messageLen ].decode( 'utf-8' )
+        return name, message
+
+    def setLink(self, idx : int, link : int, value : int )->None:
+        """Updates link 0 parentIdx, 1 subtreeEndIdx or 2 nextSiblingIdx in place"""
+        # no os.pwrite, it is missing on Windows, append continues at the end
+        self.idxFile.seek( ( idx - self.firstIdx ) * self.entryStruct.size + self.linksOffset + 8 * link )
+        self.idxFile.write( struct.pack( '<q', value ) )
+        self.idxFile.seek( 0, os.SEEK_END )
+
+    def remove(self)->None:
+        for fileMap in [ self.idxMap, self.datMap ]:
+            if fileMap is not None:
+                fileMap.close()
+        self.idxFile.close()
+        self.datFile.close()
+        os.remove( self.path + '.idx' )
+        os.remove( self.path + '.dat' )
+
+class RecordSpill():
+    """
+    keeps the records evicted from a RecordingHandler on disk, in segment files of segmentSize records
+    the oldest segments are removed if the files exceed maxBytes
+    """
+
+    def __init__(self, directory : str | None = None, segmentSize : int = 100000, maxBytes : int = 1 << 30 )->None:
+        self.ownDirectory = directory is None
+        self.directory = tempfile.mkdtemp( prefix='hlog' ) if directory is None else directory
+        self.segmentSize = segmentSize
+        self.maxBytes = maxBytes
+        self.segments : list[SpillSegment] = []
+        self.minIdx = 0
+        self.endIdx = 0
+        """idx after the last spilled one"""
+
+    def contains(self, idx : int )->bool:
+        return idx >= self.minIdx and idx < self.endIdx
+
+    def segment(self, idx : int )->SpillSegment:
+        return self.segments[ ( idx - self.segments[0].firstIdx ) // self.segmentSize ]
+
+    def append(self, idx : int, levelNo : int, hierarchyStage : int, created : float, parentIdx : int,
+               subtreeEndIdx : int, nextSiblingIdx : int, name : str, message : str )->None:
+        if len( self.segments ) == 0:
+            self.minIdx = self.endIdx = idx
+        if len( self.segments ) == 0 or self.segments[-1].cnt == self.segmentSize:
+            self.segments.append( SpillSegment( os.path.join( self.directory, 'spill%012d' % idx ), idx ) )
+            # rotate, the new segment is kept
+            while len( self.segments ) > 1 and sum( segment.size() for segment in self.segments ) > self.maxBytes:
+                self.segments.pop( 0 ).remove()
+                self.minIdx = self.segments[0].firstIdx
+        self.segments[-1].append( levelNo, hierarchyStage, created, parentIdx, subtreeEndIdx, nextSiblingIdx,
+                                  name, message )
+        self.endIdx = idx + 1
+
+    def levelNoAt(self, idx : int )->int:
+        return self.segment( idx ).entry( idx )[0]
+
+    def hierarchyStageAt(self, idx : int )->int:
+        return self.segment( idx ).entry( idx )[1]
+
+    def link(self, idx : int, link : int )->int:
+        return self.segment( idx ).entry( idx )[3 + link]
+
+    def setLink(self, idx : int, link : int, value : int )->None:
+        self.segment( idx ).setLink( idx, link, value )
+
+    def record(self, idx : int )->HLogRecord:
+        """Retrieves a new record with the stored fields"""
+        segment = self.segment( idx )
+        levelNo, hierarchyStage, created = segment.entry( idx )[0:3]
+        name, message = segment.texts( idx )
+        return makeHLogRecord( { 'name' : name, 'levelno' : levelNo, 'levelname' : logging.getLevelName( levelNo ),
+                                        'msg' : message, 'message' : message, 'args' : None,
+                                        'created' : created, 'msecs' : createdMsecs( created ),
+                                        'relativeCreated' : (created - logging._startTime) * 1000,
+                                        'hierarchyStage' : hierarchyStage, 'idx' : idx,
+                                        'showSubrecords' : None, 'maxChildLevelNo' : -1 } )
+
+    def clear(self)->None:
+        for segment in self.segments:
+            segment.remove()
+        self.segments.clear()
+        self.minIdx = self.endIdx = 0
+
+    def close(self)->None:
+        self.clear()
+        if self.ownDirectory:
+            shutil.rmtree( self.directory, ignore_errors=True )
+
+class MessageIndex():
+    """
+    inverted index of the message tokens of the stored records, tokens are lower case words
+    every token has the ascending list of the absolute idxs of the records containing it,
+    evicted idxs are skipped by bisecting from minIdx and trimmed in bulk,
+    tokens not occuring in stored records anymore are removed
+    """
+
+    tokenPattern = re.compile( r'\w+' )
+
+    def __init__(self)->None:
+        self.postings : dict[str,list[int]] = {}
+        self.sortedTokens : list[str] = []
+        """sorted tokens for prefix queries, may contain removed tokens"""
+        self.newTokens : list[str] = []
+        """tokens added since sortedTokens was updated"""
+        self.minIdx = 0
+
+    def tokenize(self, text : str)->list[str]:
+        return self.tokenPattern.findall( text.lower() )
+
+    def add(self, idx : int, message : str)->None:
+        for token in set( self.tokenize( message ) ):
+            idxs = self.postings.get( token )
+            if idxs is None:
+                self.postings[ token ] = [ idx ]
+                self.newTokens.append( token )
+            else:
+                idxs.append( idx )
+
+    def remove(self, idx : int, message : str)->None:
+        """Removes the evicted record idx, which is the oldest one"""
+        self.minIdx = idx + 1
+        for token in set( self.tokenize( message ) ):
+            idxs = self.postings.get( token )
+            if idxs is None:
+                continue
+            if idxs[-1] <= idx:
+                del self.postings[ token ]
+            elif len( idxs ) > 64 and idxs[ len( idxs ) // 2 ] <= idx:
+                del idxs[ : bisect.bisect_left( idxs, self.minIdx ) ]
+
+    def tokensWithPrefix(self, prefix : str)->list[str]:
+        if len( self.newTokens ):
+            self.sortedTokens = sorted( { token for token in self.sortedTokens + self.newTokens
+                                          if token in self.postings } )
+            self.newTokens.clear()
+        tokens = []
+        for pos in range( bisect.bisect_left( self.sortedTokens, prefix ), len( self.sortedTokens ) ):
+            token = self.sortedTokens[ pos ]
+            if not token.startswith( prefix ):
+                break
+            if token in self.postings:
+                tokens.append( token )
+        return tokens
+
+    def iterToken(self, token : str, fromIdx : int, toIdx : int, prefix : bool = False ):
+        """Iterates the ascending idxs from fromIdx to toIdx of the records containing token"""
+        tokens = self.tokensWithPrefix( token ) if prefix else [ token ]
+        iterators = []
+        for token in tokens:
+            idxs = self.postings.get( token )
+            if idxs is None:
+                continue
+            begin = bisect.bisect_left( idxs, max( fromIdx, self.minIdx ) )
+            end = bisect.bisect_right( idxs, toIdx )
+            iterators.append( idxs[ pos ] for pos in range( begin, end ) )
+        lastIdx = -1
+        for idx in heapq.merge( *iterators ):
+            if idx != lastIdx:
+                yield idx
+                lastIdx = idx
+
+    def contains(self, token : str, idx : int, prefix : bool = False )->bool:
+        for _ in self.iterToken( token, idx, idx, prefix ):
+            return True
+        return False
+
+    def find(self, text : str, fromIdx : int, toIdx : int, prefix : bool = False ):
+        """
+        Iterates the ascending idxs from fromIdx to toIdx of the records containing all tokens of text,
+        with prefix the last token matches as prefix
+        """
+        tokens = self.tokenize( text )
+        if len( tokens ) == 0:
+            return
+        last = len( tokens ) - 1
+        # the rarest exact token drives the iteration
+        driver = min( range( len( tokens ) ),
+                      key = lambda pos: len( self.postings.get( tokens[ pos ], () ) ) if pos != last or not prefix
+                                        else len( self.postings ) * 1000 )
+        for idx in self.iterToken( tokens[ driver ], fromIdx, toIdx, prefix and driver == last ):
+            if all( self.contains( token, idx, prefix and pos == last )
+                    for pos, token in enumerate( tokens ) if pos != driver ):
+                yield idx
+
+    def clear(self)->None:
+        self.postings.clear()
+        self.sortedTokens.clear()
+        self.newTokens.clear()
+        self.minIdx = 0
+
+class RecordFilter():
+    """
+    composable filter for the stored records, a record matches if it meets all given criteria
+    loggerName matches the logger and its descendants, times are epoch seconds or datetimes
+    filters are combined with & and |, compile turns a filter once into a predicate over the store
+    the checks are ordered by their costs, numeric fields first, the message regex last
+    """
+
+    def __init__(self, loggerName : str | None = None, messagePattern : str | re.Pattern | None = None,
+                 fromTime : float | datetime | None = None, toTime : float | datetime | None = None,
+                 maxHierarchyStage : int | None = None, levelNos : set[int] | None = None )->None:
+        self.loggerName = loggerName
+        self.messagePattern = re.compile( messagePattern ) if isinstance( messagePattern, str ) else messagePattern
+        self.fromTime = fromTime.timestamp() if isinstance( fromTime, datetime ) else fromTime
+        self.toTime = toTime.timestamp() if isinstance( toTime, datetime ) else toTime
+        self.maxHierarchyStage = maxHierarchyStage
+        self.levelNos = levelNos
+
+    def __and__(self, other : 'RecordFilter')->'RecordFilter':
+        return CombinedRecordFilter( all, [ self, other ] )
+
+    def __or__(self, other : 'RecordFilter')->'RecordFilter':
+        return CombinedRecordFilter( any, [ self, other ] )
+
+    def compile(self, store : RecordStore | ColumnarRecordStore, messageCache : dict[str,bool] | None = None ):
+        """
+        Creates the predicate( relIdx ) -> bool for the records of store
+        the results for logger names (and for messages with a messageCache) are cached by string
+        """
+        checks = []
+        if self.maxHierarchyStage is not None:
+            maxHierarchyStage = self.maxHierarchyStage
+            checks.append( lambda relIdx: store.hierarchyStageAt( relIdx ) <= maxHierarchyStage )
+        if self.levelNos is not None:
+            levelNos = frozenset( self.levelNos )
+            checks.append( lambda relIdx: store.levelNoAt( relIdx ) in levelNos )
+        if self.fromTime is not None:
+            fromTime = self.fromTime
+            checks.append( lambda relIdx: store.createdAt( relIdx ) >= fromTime )
+        if self.toTime is not None:
+            toTime = self.toTime
+            checks.append( lambda relIdx: store.createdAt( relIdx ) <= toTime )
+        if self.loggerName is not None:
+            loggerName = self.loggerName
+            loggerPrefix = loggerName + '.'
+            loggerCache : dict[str,bool] = {}
+            def matchesLogger( relIdx ):
+                name = store.loggerNameAt( relIdx )
+                matches = loggerCache.get( name )
+                if matches is None:
+                    matches = loggerCache[ name ] = name == loggerName or name.startswith( loggerPrefix )
+                return matches
+            checks.append( matchesLogger )
+        if self.messagePattern is not None:
+            search = self.messagePattern.search
+            if messageCache is None:
+                checks.append( lambda relIdx: search( store.messageAt( relIdx ) ) is not None )
+            else:
+                def matchesMessage( relIdx ):
+                    message = store.messageAt( relIdx )
+                    matches = messageCache.get( message )
+                    if matches is None:
+                        matches = messageCache[ message ] = search( message ) is not None
+                    return matches
+                checks.append( matchesMessage )
+
+        if len( checks ) == 0:
+            return lambda relIdx: True
+        if len( checks ) == 1:
+            return checks[0]
+        return lambda relIdx: all( check( relIdx ) for check in checks )
+
+class CombinedRecordFilter( RecordFilter ):
+    """combines RecordFilters by all (&) or any (|)"""
+
+    def __init__(self, combine, filters : list[RecordFilter] )->None:
+        RecordFilter.__init__(self)
+        self.combine = combine
+        self.filters = filters
+
+    def compile(self, store : RecordStore | ColumnarRecordStore, messageCache : dict[str,bool] | None = None ):
+        predicates = [ recordFilter.compile( store, None if messageCache is None else {} )
+                       for recordFilter in self.filters ]
+        combine = self.combine
+        return lambda relIdx: combine( predicate( relIdx ) for predicate in predicates )
+
+class LevelNamesFilter( dict ):
+    """
+    enabled state per level name, every change is reported to onChange
+    e.g. to update a bitmask of the disabled levels
+    """
+
+    def __init__(self, onChange )->None:
+        dict.__init__(self)
+        self.onChange = onChange
+
+    def __setitem__(self, levelName : str, enabled : bool )->None:
+        dict.__setitem__(self, levelName, enabled)
+        self.onChange()
+
+    def __delitem__(self, levelName : str )->None:
+        dict.__delitem__(self, levelName)
+        self.onChange()
+
+    def update(self, *args, **kwargs )->None:
+        dict.update(self, *args, **kwargs)
+        self.onChange()
 
 class RecordingHandler( logging.Handler ):
     """
     log handler to collect and store log records up to a certain amount
     records are accessible by their unique absolute index
+    with columnar the records are stored in a ColumnarRecordStore instead of keeping the record objects
+    with messageIndex the message tokens are indexed by a MessageIndex for findMessages and nextMatch
+    with spill the evicted records are kept in a RecordSpill in spillDirectory (a temporary one for None) up to
+    maxSpillBytes, in segments of spillSegmentSize records (maxCntRecords for None),
+    at, record, parentIdx, children and the filtered children work for them as well
     """
 
-    def __init__(self, maxCntRecords: int =  100000 )->None:
+    filterCacheClass = RingBuffer
+    """class of the filter cache columns, HLogFileModel allocates them lazily"""
+    filterCntTypecode = 'q'
+    levelNoTreeClass = RangeMaxTree
+
+    def __init__(self, maxCntRecords: int =  100000, columnar : bool = False, messageIndex : bool = False,
+                 spill : bool = False, spillDirectory : str | None = None, maxSpillBytes : int = 1 << 30,
+                 spillSegmentSize : int | None = None )->None:
         logging.Handler.__init__(self=self)
         self.maxCntRecords = maxCntRecords
-        self.records = deque( maxlen=self.maxCntRecords )  # type: deque[HLogRecord]
+        if columnar:
+            self.records = ColumnarRecordStore( self.maxCntRecords )
+        else:
+            self.records = RecordStore( self.maxCntRecords )
         self.entireAdded = 0
-        self.levelNamesFilter : dict[str,bool] = {}
+        self.disabledLevelsMask = 0
+        """bit levelno is set if the level is filtered out"""
+        self.filterGeneration = 0
+        """incremented on every filter change, invalidates the cached counts of filtered children"""
+        self.levelNamesFilter : dict[str,bool] = LevelNamesFilter( self.filterChanged )
+
+        # hierarchy index, maintained at emit time
+        self.parentIdxs = RingBuffer( self.maxCntRecords, 'q', -1 )
+        """absolute parent idx per stored record, -1 if none"""
+        self.subtreeEndIdxs = RingBuffer( self.maxCntRecords, 'q', -1 )
+        """absolute idx of the last record of the subtree per stored record, -1 while the subtree is open"""
+        self.nextSiblingIdxs = RingBuffer( self.maxCntRecords, 'q', -1 )
+        """absolute idx of the next record with the same parent per stored record, -1 if none (yet)"""
+        self.openAncestors : list[tuple[int,int]] = []
+        """stack of (hierarchyStage, idx) of the records whose subtree is still open"""
+        self.subtreeMaxLevelNos = RingBuffer( self.maxCntRecords, 'i', -1 )
+        """max levelno of the descendants per stored record, -1 without descendants"""
+        self.levelNos = self.levelNoTreeClass( self.maxCntRecords )
+        """levelno per slot of the ring columns, for subtree max queries"""
+        self.filteredChildCnts = self.filterCacheClass( self.maxCntRecords, self.filterCntTypecode, 0 )
+        """cached count of filtered children per stored record, valid for filteredChildCntGenerations == filterGeneration"""
+        self.filteredChildCntGenerations = self.filterCacheClass( self.maxCntRecords, self.filterCntTypecode, -1 )
+
+        self.recordFilter : RecordFilter | None = None
+        self.recordFilterPredicate = None
+        self.recordFilterResults = self.filterCacheClass( self.maxCntRecords, 'B', 1 )
+        """per stored record 0 if filtered out by the recordFilter, 1 if it matches, 2 if it is an ancestor of a match"""
+        self.ancestorsRevealed = False
+        """set if an appended match made formerly filtered out ancestors visible"""
+
+        self.messageIndex = MessageIndex() if messageIndex else None
+        self.spill = RecordSpill( spillDirectory, spillSegmentSize or maxCntRecords, maxSpillBytes ) if spill else None
+
+        self.createdMonotonic = True
+        """True as long as the records were appended in created order, the created column is searched directly"""
+        self.createdOrder : list[tuple[float,int]] = []
+        """(created, idx) sorted, fallback index for out of order records, e.g. from merged files"""
 
         # initializes filter for levelname
-        for name,id in logging.getLevelNamesMapping().items():
-            self.levelNamesFilter[name] = True
+        self.levelNamesFilter.update( { name : True for name in logging.getLevelNamesMapping() } )
+
+    def filterChanged(self)->None:
+        """Rebuilds the bitmask of the disabled levels and invalidates the cached counts"""
+        mask = 0
+        for name, enabled in self.levelNamesFilter.items():
+            if enabled:
+                continue
+            # aliases like WARN are no record levelnames, only the canonical name of a level counts
+            levelNo = logging.getLevelNamesMapping().get( name )
+            if levelNo is not None and logging.getLevelName( levelNo ) == name:
+                mask |= 1 << levelNo
+        self.disabledLevelsMask = mask
+        self.filterGeneration += 1
+
+    def setRecordFilter(self, recordFilter : RecordFilter | None )->None:
+        """
+        Applies a RecordFilter to the stored and all further records, None removes it
+        matches and their ancestors pass the filter, so the tree shape survives
+        """
+        self.recordFilter = recordFilter
+        self.recordFilterPredicate = None
+        self.recordFilterResults.clear()
+        if recordFilter is None:
+            for relIdx in range( len( self.records ) ):
+                self.recordFilterResults.append( 1 )
+        else:
+            # single pass, the message matches are cached for repeated messages
+            predicate = recordFilter.compile( self.records, {} )
+            for relIdx in range( len( self.records ) ):
+                self.recordFilterResults.append( 0 )
+                if predicate( relIdx ):
+                    self.markRecordFilterMatch( relIdx )
+            self.recordFilterPredicate = recordFilter.compile( self.records )
+        self.ancestorsRevealed = False
+        self.filterGeneration += 1
+        self.filteredRecordsChanged()
+
+    def markRecordFilterMatch(self, relIdx : int )->None:
+        """Marks a match of the recordFilter and makes its ancestors visible"""
+        self.recordFilterResults[ relIdx ] = 1
+        minIdx = self.minIdx()
+        parentIdx = self.parentIdxs[ relIdx ]
+        while parentIdx >= minIdx:
+            parentRelIdx = parentIdx - minIdx
+            if self.recordFilterResults[ parentRelIdx ]:
+                break
+            self.recordFilterResults[ parentRelIdx ] = 2
+            self.ancestorsRevealed = True
+            parentIdx = self.parentIdxs[ parentRelIdx ]
+
+    def filteredRecordsChanged(self)->None:
+        """Notification about a changed recordFilter, to be overridden by views"""
+        pass
 
     def addCustomLevel(self, levelId, levelName):
         """
@@ -145,6 +1221,37 @@ class RecordingHandler( logging.Handler ):
 
         inits/fills the new members for hlog functionality
         """
+        self.appendRecord( record )
+        self.recordsAppended( record.idx, record.idx )
+
+    def emitMany(self, records : list[HLogRecord], respectLevel : bool = True )->None:
+        """
+        emits a batch of records, e.g. for bulk loading, under a single lock acquire
+        like at handle the filters and, if respectLevel, the level are applied, the views get one recordsAppended notification
+        """
+        self.acquire()
+        try:
+            firstIdx = self.entireAdded
+            for record in records:
+                if respectLevel and record.levelno < self.level:
+                    continue
+                filtered = self.filter( record )
+                if not filtered:
+                    continue
+                if isinstance( filtered, logging.LogRecord ):
+                    record = filtered
+                self.appendRecord( record )
+            if self.entireAdded > firstIdx:
+                self.recordsAppended( max( firstIdx, self.minIdx() ), self.maxIdx() )
+        finally:
+            self.release()
+
+    def recordsAppended(self, firstIdx : int, lastIdx : int )->None:
+        """Notification about the records appended by emit or emitMany, to be overridden by views"""
+        pass
+
+    def appendRecord(self, record : HLogRecord )->None:
+        """Stores the record and updates the hierarchy index"""
 
         # fill HLogRecord members
         record.idx = self.entireAdded
@@ -155,8 +1262,172 @@ class RecordingHandler( logging.Handler ):
         record.showSubrecords = None
         record.maxChildLevelNo = -1
 
+        # the oldest record is evicted by this one
+        minIdx = self.minIdx()
+        keptIdx = minIdx
+        if len( self.records ) == self.maxCntRecords:
+            keptIdx += 1
+            if self.spill is not None:
+                self.spillOldest()
+
+        # close all subtrees which can not contain the new record, the remaining top is its parent
+        closedIdx = -1
+        while len( self.openAncestors ) and self.openAncestors[-1][0] >= record.hierarchyStage:
+            closedIdx = self.openAncestors.pop()[1]
+            if closedIdx >= keptIdx:
+                self.subtreeEndIdxs[ closedIdx - minIdx ] = record.idx - 1
+            elif self.spill is not None and self.spill.contains( closedIdx ):
+                self.spill.setLink( closedIdx, 1, record.idx - 1 )
+        parentIdx = -1
+        if record.hierarchyStage > 0 and len( self.openAncestors ):
+            parentIdx = self.openAncestors[-1][1]
+        self.openAncestors.append( (record.hierarchyStage, record.idx) )
+
+        # the last closed subtree is the previous sibling, if it has the same parent
+        if closedIdx >= keptIdx:
+            if self.parentIdxs[ closedIdx - minIdx ] == parentIdx:
+                self.nextSiblingIdxs[ closedIdx - minIdx ] = record.idx
+        elif self.spill is not None and self.spill.contains( closedIdx ):
+            if self.spill.link( closedIdx, 0 ) == parentIdx:
+                self.spill.setLink( closedIdx, 2, record.idx )
+
+        self.parentIdxs.append( parentIdx )
+        self.subtreeEndIdxs.append( -1 )
+        self.nextSiblingIdxs.append( -1 )
+        self.filteredChildCntGenerations.append( -1 )
+        self.filteredChildCnts.append( 0 )
+
+        if self.messageIndex is not None and len( self.records ) == self.maxCntRecords:
+            self.messageIndex.remove( minIdx, self.records.messageAt( 0 ) )
+
+        self.subtreeMaxLevelNos.append( -1 )
+
         self.entireAdded += 1
         self.records.append( record )
+        self.indexCreated( record )
+        self.propagateLevelNo( record, parentIdx )
+        if self.messageIndex is not None:
+            self.messageIndex.add( record.idx, self.records.messageAt( len( self.records ) - 1 ) )
+
+        if self.recordFilterPredicate is None:
+            self.recordFilterResults.append( 1 )
+        else:
+            self.recordFilterResults.append( 0 )
+            relIdx = len( self.records ) - 1
+            if self.recordFilterPredicate( relIdx ):
+                self.markRecordFilterMatch( relIdx )
+
+    def spillOldest(self)->None:
+        """Writes the oldest stored record to the spill before it is evicted"""
+        self.spill.append( self.minIdx(), self.records.levelNoAt( 0 ), self.records.hierarchyStageAt( 0 ),
+                           self.records.createdAt( 0 ), self.parentIdxs[0], self.subtreeEndIdxs[0],
+                           self.nextSiblingIdxs[0], self.records.loggerNameAt( 0 ), self.records.messageAt( 0 ) )
+
+    def isSpilled(self, idx : int )->bool:
+        """True if idx was evicted and is still available from the spill"""
+        return self.spill is not None and idx < self.minIdx() and self.spill.contains( idx )
+
+    def hierarchyStageAtIdx(self, idx : int )->int:
+        if self.isSpilled( idx ):
+            return self.spill.hierarchyStageAt( idx )
+        return self.records.hierarchyStageAt( self.idxToRelIdx( idx ) )
+
+    def propagateLevelNo(self, record : HLogRecord, parentIdx : int )->None:
+        """
+        Raises the subtree max levelno of the ancestors of the appended record,
+        stops at the first ancestor, whose subtree already has that level, so it costs at most O(depth)
+        maxChildLevelNo is set if it exceeds the own level of the ancestor, views are notified by maxChildLevelChanged
+        """
+        relIdx = len( self.records ) - 1
+        self.levelNos.set( self.subtreeMaxLevelNos.slot( relIdx ), record.levelno )
+        minIdx = self.minIdx()
+        levelNo = record.levelno
+        while parentIdx >= minIdx:
+            parentRelIdx = parentIdx - minIdx
+            if self.subtreeMaxLevelNos[ parentRelIdx ] >= levelNo:
+                break
+            self.subtreeMaxLevelNos[ parentRelIdx ] = levelNo
+            if levelNo > self.records.levelNoAt( parentRelIdx ):
+                self.records.setMaxChildLevelNo( parentRelIdx, levelNo )
+                self.maxChildLevelChanged( parentIdx )
+            parentIdx = self.parentIdxs[ parentRelIdx ]
+
+    def maxChildLevelChanged(self, idx : int )->None:
+        """Notification about a raised maxChildLevelNo of a stored record, to be overridden by views"""
+        pass
+
+    def maxLevelNo(self, fromIdx : int, toIdx : int )->int:
+        """Retrieves the max levelno of the stored records from fromIdx to toIdx in O(log n), -1 if there are none"""
+        fromIdx = max( fromIdx, self.minIdx() )
+        toIdx = min( toIdx, self.maxIdx() )
+        if fromIdx > toIdx:
+            return -1
+        return self.levelNos.max( self.subtreeMaxLevelNos.slot( self.idxToRelIdx( fromIdx ) ),
+                                  self.subtreeMaxLevelNos.slot( self.idxToRelIdx( toIdx ) ) )
+
+    def subtreeMaxLevelNo(self, idx : int )->int:
+        """Retrieves the max levelno of the descendants of idx, -1 if there are none"""
+        return self.maxLevelNo( idx + 1, self.subtreeEndIdx( idx ) )
+
+    def spanDurationNs(self, idx : int )->int | None:
+        """Retrieves the duration of the span opened by the record idx, None if it has none or it is still open"""
+        span = self.records.spanAt( self.idxToRelIdx( idx ) )
+        if span is None:
+            return None
+        return span.durationNs()
+
+    def spanSelfTimeNs(self, idx : int )->int | None:
+        """Retrieves the duration of the span idx without the durations of the outermost spans in its subtree"""
+        durationNs = self.spanDurationNs( idx )
+        if durationNs is None:
+            return None
+        pending = list( self.children( idx ) )
+        while len( pending ):
+            childIdx = pending.pop()
+            span = self.records.spanAt( self.idxToRelIdx( childIdx ) )
+            if span is None:
+                pending.extend( self.children( childIdx ) )
+            elif span.exitNs is not None:
+                durationNs -= span.durationNs()
+        return durationNs
+
+    def spanProfile(self )->dict[str, dict[str,int]]:
+        """
+        Aggregates the closed spans of the stored records by message template,
+        retrieves count, totalNs, selfNs, p50Ns and p99Ns per template, the one with the highest totalNs first
+        """
+        durations : dict[str, list[int]] = {}
+        selfTimes : dict[str, int] = {}
+        minIdx = self.minIdx()
+        for relIdx in range( len( self.records ) ):
+            span = self.records.spanAt( relIdx )
+            if span is None or span.exitNs is None:
+                continue
+            template = self.records.templateAt( relIdx )
+            durations.setdefault( template, [] ).append( span.durationNs() )
+            selfTimes[ template ] = selfTimes.get( template, 0 ) + self.spanSelfTimeNs( relIdx + minIdx )
+
+        profile = {}
+        for template, templateDurations in sorted( durations.items(), key = lambda item: -sum( item[1] ) ):
+            templateDurations.sort()
+            count = len( templateDurations )
+            profile[ template ] = { 'count' : count, 'totalNs' : sum( templateDurations ),
+                                    'selfNs' : selfTimes[ template ],
+                                    'p50Ns' : templateDurations[ ( count - 1 ) // 2 ],
+                                    'p99Ns' : templateDurations[ min( count - 1, ( count * 99 + 99 ) // 100 - 1 ) ] }
+        return profile
+
+    def exportTrace(self, traceFilePath : str, format : str = 'chrome' )->None:
+        """Exports the stored records as spans for flame graph viewers, see HLogTraceExporter"""
+        with HLogTraceExporter( traceFilePath, format ) as exporter:
+            for relIdx in range( len( self.records ) ):
+                startUs = self.records.createdAt( relIdx ) * 1000000
+                span = self.records.spanAt( relIdx )
+                exitUs = None
+                if span is not None and span.exitNs is not None:
+                    exitUs = startUs + span.durationNs() / 1000
+                exporter.addSpan( self.records.templateAt( relIdx ), self.records.hierarchyStageAt( relIdx ),
+                                  startUs, exitUs )
 
     def maxIdx(self):
         """Retrieves the maximal available absolute idx"""
@@ -170,14 +1441,18 @@ class RecordingHandler( logging.Handler ):
         """Retrieves a record by its idx, returns None if not found"""
         if idx == None:
             return None
-        relIdx = min( idx, idx - (self.entireAdded - self.maxCntRecords) )
+        if self.isSpilled( idx ):
+            return self.spill.record( idx )
+        relIdx = self.idxToRelIdx( idx )
         if relIdx < len( self.records ) and relIdx >= 0:
             return self.records[ relIdx ]
         return None
     
     def record( self, idx )->HLogRecord:
         """Retrieves a record by its idx, asserts if not found"""
-        relIdx = min( idx, idx - (self.entireAdded - self.maxCntRecords) )
+        if self.isSpilled( idx ):
+            return self.spill.record( idx )
+        relIdx = self.idxToRelIdx( idx )
         assert relIdx >= 0 and relIdx < self.maxCntRecords
         return self.records[ relIdx ]
     
@@ -186,65 +1461,189 @@ class RecordingHandler( logging.Handler ):
         return min( idx, idx - (self.entireAdded - self.maxCntRecords) )
 
     def passedFilter( self, record : HLogRecord ):
-        """Filters by levelname """
-        if not self.levelNamesFilter[ record.levelname ]:
+        """Filters a stored record by level, see levelNamesFilter, and by the recordFilter"""
+        if self.isSpilled( record.idx ):
+            return self.passedFilterAt( record.idx )
+        if ( self.disabledLevelsMask >> record.levelno ) & 1:
+            return False
+        return self.recordFilterPredicate is None or self.recordFilterResults[ self.idxToRelIdx( record.idx ) ] != 0
+
+    def passedFilterAt( self, idx : int ):
+        """Like passedFilter, without retrieving the record, spilled records are filtered by level only"""
+        if self.isSpilled( idx ):
+            return not ( self.disabledLevelsMask >> self.spill.levelNoAt( idx ) ) & 1
+        relIdx = self.idxToRelIdx( idx )
+        if ( self.disabledLevelsMask >> self.records.levelNoAt( relIdx ) ) & 1:
             return False
-        return True
+        return self.recordFilterPredicate is None or self.recordFilterResults[ relIdx ] != 0
 
-    def getFilteredChildren( self, idx = None ):
-        """Retrieves children for an idx, uses the passedFilter method to filter out only the wanted children"""
+    def children( self, idx = None ):
+        """Iterates the direct children of an idx (top level records for None), skipping whole subtrees"""
         if idx != None:
-            relIdx = min( idx, idx - (self.entireAdded - self.maxCntRecords) )
-            record = self.records[ relIdx ]
-            parentHierarchyStage = record.hierarchyStage
-            relChildIdx = relIdx + 1
+            parentHierarchyStage = self.hierarchyStageAtIdx( idx )
+            childIdx = idx + 1
+            if childIdx > self.subtreeEndIdx( idx ):
+                return
+            while childIdx != None:
+                if self.hierarchyStageAtIdx( childIdx ) == parentHierarchyStage + 1:
+                    yield childIdx
+                childIdx = self.nextSiblingIdx( childIdx )
         else:
-            parentHierarchyStage = -1
-            relChildIdx = 0
+            # the top level records of the spill first
+            childIdx = self.spill.minIdx if self.spill is not None and self.spill.endIdx > self.spill.minIdx else self.minIdx()
+            while childIdx <= self.maxIdx():
+                hierarchyStage = self.hierarchyStageAtIdx( childIdx )
+                if hierarchyStage < 0:
+                    break
+                if hierarchyStage == 0:
+                    yield childIdx
+                childIdx = self.subtreeEndIdx( childIdx ) + 1
+
+    def getFilteredChildren( self, idx = None ):
+        """Retrieves children for an idx, uses the passedFilter method to filter out only the wanted children"""
         children = []
-        while relChildIdx <= (self.maxIdx() - self.minIdx()):
-            child = self.records[ relChildIdx ]
-            if child.hierarchyStage <= parentHierarchyStage:
-                break
-            if (child.hierarchyStage == parentHierarchyStage + 1) and self.passedFilter( child ) :
-                children.append( relChildIdx + self.minIdx() )
-            relChildIdx += 1
+        for childIdx in self.children( idx ):
+            if self.passedFilterAt( childIdx ):
+                children.append( childIdx )
         return children
 
     def cntFilteredChildren( self, idx = None ):
-        """Retrieves count of children for an idx, uses the passedFilter method to filter out only the wanted children"""
-        if idx != None:
-            relIdx = min( idx, idx - (self.entireAdded - self.maxCntRecords) )
-            record = self.records[ relIdx ]
-            parentHierarchyStage = record.hierarchyStage
-            relChildIdx = relIdx + 1
-        else:
-            parentHierarchyStage = -1
-            relChildIdx = 0
+        """
+        Retrieves count of children for an idx, uses the passedFilterAt method to filter out only the wanted children
+        the count of a closed subtree is cached until the filter changes
+        """
+        relIdx = None
+        if idx != None and not self.isSpilled( idx ):
+            relIdx = self.idxToRelIdx( idx )
+            if self.filteredChildCntGenerations[ relIdx ] == self.filterGeneration:
+                return self.filteredChildCnts[ relIdx ]
         cnt = 0
-        while relChildIdx <= (self.maxIdx() - self.minIdx()):
-            child = self.records[ relChildIdx ]
-            if child.hierarchyStage <= parentHierarchyStage:
-                break
-            if (child.hierarchyStage == parentHierarchyStage + 1) and self.passedFilter( child ) :
+        for childIdx in self.children( idx ):
+            if self.passedFilterAt( childIdx ):
                 cnt += 1
-            relChildIdx += 1
+        if relIdx != None and self.subtreeEndIdxs[ relIdx ] >= 0:
+            self.filteredChildCnts[ relIdx ] = cnt
+            self.filteredChildCntGenerations[ relIdx ] = self.filterGeneration
         return cnt
 
-    def parentIdx( self, idx ):
-        """Retrieves the parent idx record for the idx"""
-        relIdx = min( idx, idx - (self.entireAdded - self.maxCntRecords) )
-        record = self.records[ relIdx ]
-        if record.hierarchyStage <= 0:
-            return None
-        relIdx -= 1
-        while relIdx >= 0:
-            if self.records[ relIdx ].hierarchyStage < record.hierarchyStage:
-                return self.minIdx() + relIdx
-            relIdx -= 1
+    def indexCreated( self, record : HLogRecord )->None:
+        """Keeps the created order, switches to the fallback index with the first out of order record"""
+        if self.createdMonotonic:
+            if len( self.records ) < 2 or self.records.createdAt( len( self.records ) - 2 ) <= record.created:
+                return
+            self.createdMonotonic = False
+            self.createdOrder = sorted( ( self.records.createdAt( relIdx ), relIdx + self.minIdx() )
+                                        for relIdx in range( len( self.records ) ) )
+            return
+        bisect.insort( self.createdOrder, ( record.created, record.idx ) )
+        if len( self.createdOrder ) > 2 * self.maxCntRecords:
+            # remove the evicted records
+            minIdx = self.minIdx()
+            self.createdOrder = [ entry for entry in self.createdOrder if entry[1] >= minIdx ]
+
+    def createdBisect( self, t : float, right : bool )->int:
+        """Retrieves the insertion relIdx for t in the monotonic created column"""
+        low, high = 0, len( self.records )
+        while low < high:
+            mid = ( low + high ) // 2
+            created = self.records.createdAt( mid )
+            if created < t or ( right and created == t ):
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def idxAtTime( self, t : float | datetime )->int | None:
+        """Retrieves the idx of the first record created at or after t, None if there is none"""
+        if isinstance( t, datetime ):
+            t = t.timestamp()
+        if self.createdMonotonic:
+            relIdx = self.createdBisect( t, False )
+            return relIdx + self.minIdx() if relIdx < len( self.records ) else None
+        minIdx = self.minIdx()
+        for pos in range( bisect.bisect_left( self.createdOrder, ( t, -1 ) ), len( self.createdOrder ) ):
+            if self.createdOrder[ pos ][1] >= minIdx:
+                return self.createdOrder[ pos ][1]
+        return None
 
+    def rangeBetween( self, t1 : float | datetime, t2 : float | datetime )->collections.abc.Sequence[int]:
+        """Retrieves the idxs of the records created from t1 to t2 in created order"""
+        if isinstance( t1, datetime ):
+            t1 = t1.timestamp()
+        if isinstance( t2, datetime ):
+            t2 = t2.timestamp()
+        if self.createdMonotonic:
+            return range( self.createdBisect( t1, False ) + self.minIdx(), self.createdBisect( t2, True ) + self.minIdx() )
+        minIdx = self.minIdx()
+        begin = bisect.bisect_left( self.createdOrder, ( t1, -1 ) )
+        end = bisect.bisect_right( self.createdOrder, ( t2, self.entireAdded ) )
+        return [ idx for created, idx in self.createdOrder[ begin : end ] if idx >= minIdx ]
+
+    def findMessages( self, text : str, prefix : bool = False, subtreeIdx : int | None = None )->list[int]:
+        """
+        Retrieves the ascending idxs of the records whose message contains all words of text, ignoring case
+        with prefix the last word matches as prefix, with subtreeIdx only the subtree of subtreeIdx is searched
+        """
+        return list( self.iterMatches( text, self.minIdx(), prefix, subtreeIdx ) )
+
+    def nextMatch( self, text : str, idx : int | None = None, prefix : bool = False,
+                   subtreeIdx : int | None = None )->int | None:
+        """Retrieves the first idx after idx (from the start for None) like findMessages, None if there is none"""
+        fromIdx = self.minIdx() if idx is None else idx + 1
+        for matchIdx in self.iterMatches( text, fromIdx, prefix, subtreeIdx ):
+            return matchIdx
         return None
 
+    def iterMatches( self, text : str, fromIdx : int, prefix : bool, subtreeIdx : int | None ):
+        toIdx = self.maxIdx()
+        if subtreeIdx is not None:
+            fromIdx = max( fromIdx, subtreeIdx )
+            toIdx = self.subtreeEndIdx( subtreeIdx )
+        fromIdx = max( fromIdx, self.minIdx() )
+        if self.messageIndex is not None:
+            yield from self.messageIndex.find( text, fromIdx, toIdx, prefix )
+            return
+        # without index every message is tokenized
+        index = MessageIndex()
+        tokens = index.tokenize( text )
+        if len( tokens ) == 0:
+            return
+        for idx in range( fromIdx, toIdx + 1 ):
+            words = index.tokenize( self.records.messageAt( self.idxToRelIdx( idx ) ) )
+            if all( token in words for token in tokens[ : -1 ] ) and \
+               any( word == tokens[-1] or ( prefix and word.startswith( tokens[-1] ) ) for word in words ):
+                yield idx
+
+    def subtreeEndIdx( self, idx ):
+        """Retrieves the idx of the last record in the subtree of idx, maxIdx for a still open subtree"""
+        if self.isSpilled( idx ):
+            subtreeEndIdx = self.spill.link( idx, 1 )
+        else:
+            subtreeEndIdx = self.subtreeEndIdxs[ self.idxToRelIdx( idx ) ]
+        if subtreeEndIdx < 0:
+            return self.maxIdx()
+        return subtreeEndIdx
+
+    def nextSiblingIdx( self, idx ):
+        """Retrieves the idx of the next record with the same parent, None if there is none (yet)"""
+        if self.isSpilled( idx ):
+            nextSiblingIdx = self.spill.link( idx, 2 )
+        else:
+            nextSiblingIdx = self.nextSiblingIdxs[ self.idxToRelIdx( idx ) ]
+        if nextSiblingIdx < 0:
+            return None
+        return nextSiblingIdx
+
+    def parentIdx( self, idx ):
+        """Retrieves the parent idx record for the idx, None if there is none or it was already removed"""
+        if self.isSpilled( idx ):
+            parentIdx = self.spill.link( idx, 0 )
+        else:
+            parentIdx = self.parentIdxs[ self.idxToRelIdx( idx ) ]
+        if parentIdx < self.minIdx() and not self.isSpilled( parentIdx ):
+            return None
+        return parentIdx
+
     def parentRecord( self, idx )->HLogRecord:
         """Retrieves the parent record for the idx"""
         parentIdx = self.parentIdx( idx )
@@ -252,9 +1651,269 @@ class RecordingHandler( logging.Handler ):
             return self.record( parentIdx )
         return None
     
+    def to_arrays(self)->dict[str,any]:
+        """
+        Exports the stored records column wise, the oldest first, for vectorized analysis
+        the columns are numpy arrays if numpy is available, otherwise typed arrays
+        loggerNameId and messageId refer to the lists loggerNames and messages
+        """
+        columns = self.records.columns()
+        columns['idx'] = array( 'q', range( self.minIdx(), self.maxIdx() + 1 ) )
+        columns['parentIdx'] = self.parentIdxs.ordered()
+        if numpy is not None:
+            for name,column in columns.items():
+                if isinstance( column, array ):
+                    columns[name] = numpy.frombuffer( column, dtype=column.typecode )
+        return columns
+
+    def close(self)->None:
+        """Removes the spill files, see logging.Handler.close"""
+        if self.spill is not None:
+            self.spill.close()
+        super().close()
+
     def clear(self):
         self.entireAdded = 0
         self.records.clear()
+        self.parentIdxs.clear()
+        self.subtreeEndIdxs.clear()
+        self.nextSiblingIdxs.clear()
+        self.subtreeMaxLevelNos.clear()
+        self.levelNos.clear()
+        self.filteredChildCnts.clear()
+        self.filteredChildCntGenerations.clear()
+        self.recordFilterResults.clear()
+        if self.messageIndex is not None:
+            self.messageIndex.clear()
+        self.createdMonotonic = True
+        self.createdOrder.clear()
+        if self.spill is not None:
+            self.spill.clear()
+        self.openAncestors.clear()
+
+class HLogQueueHandler( logging.handlers.QueueHandler ):
+    """
+    hands the records over to a queue, to be processed by a HLogQueueListener in a background thread
+    the hierarchyStage is captured by the record factory at record creation,
+    thread (and taskName since python 3.12) identify the producer
+    the message is formatted by the listener's handlers, so arguments must not be changed after logging,
+    handling a record is just an enqueue without taking a lock
+    """
+
+    def __init__(self, recordQueue : queue.SimpleQueue | queue.Queue | None = None ):
+        if recordQueue is None:
+            recordQueue = queue.SimpleQueue()
+        logging.handlers.QueueHandler.__init__(self, recordQueue)
+
+    def handle(self, record : HLogRecord ):
+        """like logging.Handler.handle, but the thread safe queue needs no handler lock"""
+        filtered = self.filter( record )
+        if isinstance( filtered, logging.LogRecord ):
+            record = filtered
+        if filtered:
+            self.emit( record )
+        return filtered
+
+    def prepare(self, record : HLogRecord ) -> HLogRecord:
+        """the record is enqueued as it is, formatting is left to the handlers of the listener"""
+        return record
+
+class HLogQueueListener( logging.handlers.QueueListener ):
+    """
+    drains the queue of a HLogQueueHandler in a background thread and hands the records over in batches,
+    handlers with emitMany (RecordingHandler and the views) get a batch at once, the other ones record by record
+    the order of the queue is kept, so the records of every producer stay in their order
+    Tk views must not be updated from the background thread, drain the queue with drain from the mainloop instead
+    like for logging.handlers.QueueListener, the handler levels are ignored unless respect_handler_level is passed True
+    """
+
+    def __init__(self, recordQueue, *handlers, respect_handler_level : bool = False, batchSize : int = 1000 ):
+        logging.handlers.QueueListener.__init__(self, recordQueue, *handlers,
+                                                respect_handler_level = respect_handler_level )
+        self.batchSize = batchSize
+
+    def dequeueBatch(self, block : bool ) -> list[HLogRecord]:
+        """Retrieves up to batchSize records, waits for the first one if block"""
+        batch = []
+        try:
+            batch.append( self.queue.get( block ) )
+            while len( batch ) < self.batchSize:
+                batch.append( self.queue.get_nowait() )
+        except queue.Empty:
+            pass
+        return batch
+
+    def handleBatch(self, records : list[HLogRecord] ):
+        for handler in self.handlers:
+            if hasattr( handler, 'emitMany' ):
+                handler.emitMany( records, self.respect_handler_level )
+                continue
+            for record in records:
+                if not self.respect_handler_level or record.levelno >= handler.level:
+                    handler.handle( record )
+
+    def processBatch(self, batch : list[HLogRecord] ) -> bool:
+        """Handles a dequeued batch, returns False if it contained the sentinel"""
+        cntDequeued = len( batch )
+        running = True
+        if self._sentinel in batch:
+            batch = batch[ : batch.index( self._sentinel ) ]
+            running = False
+        if len( batch ):
+            self.handleBatch( batch )
+        if hasattr( self.queue, 'task_done' ):
+            for i in range( cntDequeued ):
+                self.queue.task_done()
+        return running
+
+    def drain(self) -> None:
+        """Handles all records queued so far in the calling thread, e.g. from the Tk mainloop via after"""
+        while True:
+            batch = self.dequeueBatch( False )
+            if not len( batch ) or not self.processBatch( batch ):
+                break
+
+    def _monitor(self):
+        """runs in the background thread, see logging.handlers.QueueListener"""
+        while self.processBatch( self.dequeueBatch( True ) ):
+            pass
+
+class HLogTraceExporter():
+    """
+    streams the hierarchy as spans into a trace file for flame graph viewers,
+    format 'chrome' writes Chrome trace events (X events), 'speedscope' the evented speedscope format
+    the spans are passed in log order, a span ends at its explicit exit time, if known,
+    otherwise with the start of the next span with the same or a higher hierarchy stage
+    only the stack of open spans is kept, so 'chrome' streams in constant memory,
+    'speedscope' keeps a frame per distinct name until close, so pass message templates instead of formatted messages
+    """
+
+    def __init__(self, traceFilePath : str, format : str = 'chrome', name : str = 'hlog' )->None:
+        assert format in ( 'chrome', 'speedscope' ), f"Unknown trace format {format}"
+        self.format = format
+        self.name = name
+        self.file = open( traceFilePath, 'w' )
+        self.openSpans : list[list] = []
+        """stack of [ hierarchyStage, frame, startUs, exitUs, childrenEndUs ]"""
+        self.frames : dict[str,int] = {}
+        self.firstUs = None
+        self.lastUs = 0.0
+        self.cntEvents = 0
+        if self.format == 'chrome':
+            self.file.write( '{"traceEvents":[\n' )
+        else:
+            self.file.write( '{"$schema":"https://www.speedscope.app/file-format-schema.json",'
+                             '"profiles":[{"type":"evented","name":%s,"unit":"microseconds","events":[\n'
+                             % json.dumps( name ) )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def writeEvent(self, event : dict )->None:
+        if self.cntEvents:
+            self.file.write( ',\n' )
+        self.file.write( json.dumps( event, separators=(',',':') ) )
+        self.cntEvents += 1
+
+    def closeSpans(self, hierarchyStage : int, atUs : float )->None:
+        """Ends the open spans with hierarchyStage or a lower one"""
+        while len( self.openSpans ) and self.openSpans[-1][0] >= hierarchyStage:
+            stage, frame, startUs, exitUs, childrenEndUs = self.openSpans.pop()
+            endUs = atUs if exitUs is None else min( exitUs, atUs )
+            endUs = max( endUs, childrenEndUs, startUs )
+            if self.format == 'chrome':
+                self.writeEvent( { 'name' : frame, 'ph' : 'X', 'ts' : startUs, 'dur' : endUs - startUs,
+                                   'pid' : 0, 'tid' : 0 } )
+            else:
+                self.writeEvent( { 'type' : 'C', 'frame' : self.frames[ frame ], 'at' : endUs - self.firstUs } )
+            if len( self.openSpans ):
+                self.openSpans[-1][4] = max( self.openSpans[-1][4], endUs )
+
+    def addSpan(self, name : str, hierarchyStage : int, startUs : float, exitUs : float | None = None )->None:
+        """Adds the span of the next record, exitUs is the explicit end, if known"""
+        if self.firstUs is None:
+            self.firstUs = startUs
+        # the time must not go back for the viewers
+        startUs = max( startUs, self.lastUs )
+        self.lastUs = startUs
+        hierarchyStage = max( 0, hierarchyStage )
+        self.closeSpans( hierarchyStage, startUs )
+        if self.format == 'speedscope':
+            if not name in self.frames:
+                self.frames[ name ] = len( self.frames )
+            self.writeEvent( { 'type' : 'O', 'frame' : self.frames[ name ], 'at' : startUs - self.firstUs } )
+        self.openSpans.append( [ hierarchyStage, name, startUs, exitUs, startUs ] )
+
+    def addRecord(self, record : HLogRecord )->None:
+        """Adds the span of a record, named by its message template, timed by its HLogSpan if available"""
+        startUs = record.created * 1000000
+        span = getattr( record, 'span', None )
+        exitUs = None
+        if span is not None and span.exitNs is not None:
+            exitUs = startUs + span.durationNs() / 1000
+        self.addSpan( str( record.msg ), record.hierarchyStage, startUs, exitUs )
+
+    def close(self)->None:
+        if self.file is None:
+            return
+        endUs = self.lastUs
+        for span in self.openSpans:
+            if span[3] is not None:
+                endUs = max( endUs, span[3] )
+        self.closeSpans( 0, endUs )
+        if self.format == 'chrome':
+            self.file.write( '\n]}\n' )
+        else:
+            firstUs = 0.0 if self.firstUs is None else self.firstUs
+            frames = [ { 'name' : name } for name in self.frames ]
+            self.file.write( '\n],"startValue":0,"endValue":%s}],"shared":{"frames":%s},"name":%s,"exporter":"hlog"}\n'
+                             % ( json.dumps( endUs - firstUs ), json.dumps( frames ), json.dumps( self.name ) ) )
+        self.file.close()
+        self.file = None
+
+numberRe = re.compile( r'\d+' )
+
+def messageTemplate( message : str )->str:
+    """Approximates the template of a message read from a logfile, its first line with the numbers masked by '#'"""
+    return numberRe.sub( '#', message.split( '\n', 1 )[0] )
+
+def openLogFile( filePath : str ):
+    """Opens a logfile for binary reading, gzip and xz compressed files are decompressed transparently"""
+    with open( filePath, 'rb' ) as f:
+        magic = f.read( 6 )
+    if magic.startswith( b'\x1f\x8b' ):
+        return gzip.open( filePath, 'rb' )
+    if magic == b'\xfd7zXZ\x00':
+        return lzma.open( filePath, 'rb' )
+    return open( filePath, 'rb' )
+
+def standardRecordFields( filePath : str )->dict[str,any]:
+    """
+    Retrieves the fields of a record read from filePath, which are the same for all its records,
+    every record gets a copy, updated with its own fields, and set as its __dict__ at once like SlimHLogRecord does
+    """
+    fields = makeHLogRecord( {} ).__dict__
+    fields.update( { 'args' : None, 'pathname' : filePath, 'filename' : os.path.basename( filePath ),
+                     'module' : os.path.splitext( os.path.basename( filePath ) )[0], 'lineno' : 0,
+                     'funcName' : "(unknown function)", 'idx' : -1, 'showSubrecords' : None,
+                     'maxChildLevelNo' : -1 } )
+    return fields
+
+def readRecord( standardFields : dict[str,any], loggerName : str, hierarchyStage : int, levelNo : int, levelName : str,
+                created : float, message : str )->HLogRecord:
+    """Creates a record read from a logfile directly, without the record factory, standardFields see standardRecordFields"""
+    record = HLogRecord.__new__( HLogRecord )
+    fields = standardFields.copy()
+    fields.update( { 'name' : loggerName, 'msg' : message,
+                     'levelname' : levelName, 'levelno' : levelNo, 'created' : created,
+                     'msecs' : createdMsecs( created ),
+                     'relativeCreated' : (created - logging._startTime) * 1000,
+                     'hierarchyStage' : hierarchyStage } )
+    record.__dict__ = fields
+    return record
 
 class HLogIO():
     branchMarker = '|-'
@@ -276,192 +1935,194 @@ class HLogFileReader(HLogIO):
     """Reads a logfile which was written by Hierarchical Log Formatter"""
 
     class parser:
-        def __init__( self ):
-            self.tail = ''
+        """describes a format field, by the regex of its text and the conversion of the text to its value"""
+        field = ''
 
-        def parseFormat( self, fmt : str ) -> tuple[int,int]:
-            return None
+        def pattern( self ) -> str:
+            return '.*?'
 
-        def parse(self, c, iter ):
-            pass
+        def value( self, text : str ):
+            return text
 
-        def readTail( self, c : str, iter ):
-            if len(self.tail):
-                for i in range(0,len(self.tail)):
-                    if c != self.tail[i]:
-                        return False, c, iter
-                    c = next(iter)
-            return True, c, iter
-        
-        def value(self):
-            pass
+    class hierarchyParser(parser):
+        field = 'hierarchy'
 
+        def pattern( self ) -> str:
+            return f"(?P<{type(self).__name__}> *){re.escape( HLogIO.branchMarker )} *"
 
-    class hierarchyParser(parser):
-        formatRe = '(%\\(hierarchy\\))([0-9]{0,2})(s{0,1})([^%]*)'
-
-        def parseFormat( self, fmt : str ):
-            matches = re.search( self.formatRe, fmt )
-            if not len(matches.regs):
-                return None
-            self.tail = fmt[matches.regs[4][0] : matches.regs[4][1]]
-            self.len = int(fmt[matches.regs[2][0] : matches.regs[2][1]])
-            return (matches.regs[0][0],matches.regs[0][1])
-
-        def parse( self, c : str, iter ) -> int:
-            self.hierarchyLevel = 0
-            while c==' ':
-                self.hierarchyLevel += 1
-                c = next(iter)
-            if c != HLogIO.branchMarker[0]:
-                return False, c, iter
-            c = next(iter)
-            if c != HLogIO.branchMarker[1]:
-                return False, c, iter
-            
-            for i in range(0, self.len - ( self.hierarchyLevel + len(HLogIO.branchMarker))):
-                c = next(iter)
-                if c != ' ':
-                    return False, c, iter
-
-            return self.readTail( next(iter), iter )
-
-        def value(self):
-            return self.hierarchyLevel
+        def value( self, text : str ):
+            return len( text )
 
     class asctimeParser(parser):
-        formatRe = '(%\\(asctime\\))([0-9]{0,2})(s{0,1})([^%]*)'
+        """
+        a date format of fixed width numeric fields (%Y %y %m %d %H %M %S) is parsed by slicing the digits,
+        the epoch of the hour is cached, so only records of a new hour need the calendar math of mktime,
+        other formats are parsed by strptime
+        """
+        field = 'asctime'
         dateFormat = '%y-%m-%d'
+        fieldWidths = { 'Y' : 4, 'y' : 2, 'm' : 2, 'd' : 2, 'H' : 2, 'M' : 2, 'S' : 2 }
 
         def __init__(self):
             self.setDateFormat( self.dateFormat )
 
-        def parseFormat( self, fmt : str ):
-            matches = re.search( self.formatRe, fmt )
-            if not len(matches.regs):
-                return None
-            self.tail = fmt[matches.regs[4][0] : matches.regs[4][1]]
-            return (matches.regs[0][0],matches.regs[0][1])
-        
-        def setDateFormat( self, fmt : str ):
+        def setDateFormat( self, fmt : str | None ):
+            """None is the default format of logging.Formatter, which appends the msecs"""
+            self.msecsInAscTime = fmt is None
+            if fmt is None:
+                fmt = logging.Formatter.default_time_format
             now = datetime.now()
             self.dateFormat = fmt
-            self.ascTimeExample = now.strftime( fmt )
-
-        def parse( self, c : str, iter ) -> int:
-            while c == ' ':
-                c = next(iter)
-
-            ascTime = c
-            for i in range(1, len(self.ascTimeExample)):
-                ascTime += next(iter)
-
-            self.dateTime = time.strptime( ascTime, self.dateFormat )
-            self.time = time.mktime(self.dateTime)
-            if self.dateTime is None:
-               return False, c, iter
-            
-            return self.readTail( next(iter), iter )
-
-        def value(self):
-            return self.time
-
+            self.ascTimeExample = now.strftime( fmt ) + ( ',000' if self.msecsInAscTime else '' )
+            self.lastAscTime = None
+            self.lastTime = None
+            self.lastHour = None
+            self.lastHourTime = None
+
+            # slices of the fixed width fields
+            self.fieldSlices : dict[str,slice] | None = {}
+            pos = 0
+            i = 0
+            while i < len( fmt ):
+                if fmt[i] == '%' and i + 1 < len( fmt ):
+                    directive = fmt[ i + 1 ]
+                    width = self.fieldWidths.get( directive, 1 if directive == '%' else None )
+                    if width is None:
+                        self.fieldSlices = None
+                        break
+                    if directive != '%':
+                        self.fieldSlices[ directive ] = slice( pos, pos + width )
+                    pos += width
+                    i += 2
+                else:
+                    pos += 1
+                    i += 1
+            if self.fieldSlices is not None and \
+               ( not ( 'Y' in self.fieldSlices or 'y' in self.fieldSlices ) or
+                 not all( directive in self.fieldSlices for directive in 'mdHMS' ) ):
+                self.fieldSlices = None
+
+        def pattern( self ) -> str:
+            return f" *(?P<{type(self).__name__}>.{{{len( self.ascTimeExample )}}})"
+
+        def value( self, text : str ):
+            # consecutive records mostly share their time text
+            if text != self.lastAscTime:
+                self.lastTime = self.parseTime( text )
+                self.lastAscTime = text
+            return self.lastTime
+
+        def parseTime( self, text : str )->float:
+            msecs = 0
+            if self.msecsInAscTime:
+                msecs = int( text[-3:] )
+                text = text[:-4]
+            fieldSlices = self.fieldSlices
+            if fieldSlices is None:
+                return time.mktime( time.strptime( text, self.dateFormat ) ) + msecs / 1000
+            try:
+                if 'Y' in fieldSlices:
+                    year = int( text[ fieldSlices['Y'] ] )
+                else:
+                    # like strptime
+                    year = int( text[ fieldSlices['y'] ] )
+                    year += 1900 if year >= 69 else 2000
+                hour = ( year, int( text[ fieldSlices['m'] ] ), int( text[ fieldSlices['d'] ] ), int( text[ fieldSlices['H'] ] ) )
+                minute = int( text[ fieldSlices['M'] ] )
+                second = int( text[ fieldSlices['S'] ] )
+            except ValueError:
+                return time.mktime( time.strptime( text, self.dateFormat ) ) + msecs / 1000
+            if not ( 0 <= minute <= 59 and 0 <= second <= 61 ):
+                # let strptime complain
+                return time.mktime( time.strptime( text, self.dateFormat ) ) + msecs / 1000
+            if hour != self.lastHour:
+                if not ( 1 <= hour[1] <= 12 and 1 <= hour[2] <= 31 and 0 <= hour[3] <= 23 ):
+                    return time.mktime( time.strptime( text, self.dateFormat ) ) + msecs / 1000
+                self.lastHourTime = time.mktime( hour + ( 0, 0, 0, 0, -1 ) )
+                self.lastHour = hour
+            return self.lastHourTime + minute * 60 + second + msecs / 1000
+
+    class msecsParser(parser):
+        field = 'msecs'
+
+        def pattern( self ) -> str:
+            return f"(?P<{type(self).__name__}>[0-9]+)"
+
+        def value( self, text : str ):
+            return int( text )
 
     class levelnameParser(parser):
-        formatRe = '(%\\(levelname\\))([0-9]{0,2})(s{0,1})([^%]*)'
-
-        def parseFormat( self, fmt : str ):
-            matches = re.search( self.formatRe, fmt )
-            if not len(matches.regs):
-                return None
-            self.tail = fmt[matches.regs[4][0] : matches.regs[4][1]]
-            self.len = int(fmt[matches.regs[2][0] : matches.regs[2][1]])
-            return (matches.regs[0][0],matches.regs[0][1])
-
-        def parse( self, c : str, iter ) -> int:
-            while c == ' ':
-                c = next(iter)
-
-            self.levelName = ''
-            while c != ' ':
-                self.levelName += c
-                c = next(iter)
-
-            return self.readTail( c, iter )
+        field = 'levelname'
 
-        def value(self):
-            return self.levelName
+        def pattern( self ) -> str:
+            return f" *(?P<{type(self).__name__}>\\S+)"
 
     class messageParser(parser):
-        formatRe = '(%\\(message\\))([0-9]{0,2})(s{0,1})([^%]*)'
+        field = 'message'
 
-        def parseFormat( self, fmt : str ):
-            matches = re.search( self.formatRe, fmt )
-            if not len(matches.regs):
-                return None
-            self.tail = fmt[matches.regs[4][0] : matches.regs[4][1]]
-            return (matches.regs[0][0],matches.regs[0][1])
+        def pattern( self ) -> str:
+            return f"(?P<{type(self).__name__}>.*)"
 
-        def parse( self, c : str, iter ) -> int:
-            self.message = ''
-            while c != '\n':
-                self.message += c
-                c = next(iter)
+    parserClasses : list[parser] = [ asctimeParser, msecsParser, levelnameParser, messageParser, hierarchyParser ]
+    fieldRe = re.compile( '%\\((\\w+)\\)[-#0 +]*[0-9]*(?:\\.[0-9]+)?[sdf]' )
 
-            return self.readTail( c, iter )
-
-        def value(self):
-            return self.message
-        
-    parserClasses : list[parser] = [ asctimeParser, levelnameParser, messageParser, hierarchyParser ]
-
-    def __init__(self, logger : logging.Logger, fmt : str, datefmt : str ='%y-%m-%d %H:%M:%S', style : str = '%' ):
+    def __init__(self, logger : logging.Logger, fmt : str, datefmt : str ='%y-%m-%d %H:%M:%S', style : str = '%',
+                 recordingHandler : RecordingHandler | None = None, handlers : list[logging.Handler] | None = None,
+                 batchSize : int = 1000 ):
         assert style == '%'
+        self.fmt = fmt
+        self.datefmt = datefmt
+
+        self.recordingHandler = recordingHandler
+        """
+        if given, the read records are appended to it directly in batches of batchSize,
+        bypassing the logger, its record factory, filters and handlers, and its hierarchyStage isn't touched
+        """
+        self.handlers = handlers or []
+        """handlers the batches appended to recordingHandler are forwarded to"""
+        self.batchSize = batchSize
 
         hierarchyLen = HLogIO.maxHierarchy + len(HLogIO.branchMarker)
         fmt = f"%(hierarchy){hierarchyLen}s " + fmt
 
         self.logger = logger
-        assert logger.name in initializedLoggers, f"Logger {logger.name} must be initialized for hierarchy logging, with hlog.initLogHierarchy!"
-
-        self.lineParsers : list[HLogFileReader.parser] = list()
-        lineParsers = {}
-        for parserClass in HLogFileReader.parserClasses:
-            parser : HLogFileReader.parser = parserClass()
-            found = parser.parseFormat( fmt )
-            if found is not None:
-                lineParsers[ found[0] ] = parser
-                if type(parser).__name__ == HLogFileReader.asctimeParser.__name__:
-                    parser.setDateFormat( datefmt )
-
-        # sort by found pos
-        lineParsers = dict( sorted(lineParsers.items()) )
-        self.lineParsers = lineParsers.values()
+        """logger handling the read records, may be None if only entries are parsed"""
+        assert logger is None or logger.name in initializedLoggers, f"Logger {logger.name} must be initialized for hierarchy logging, with hlog.initLogHierarchy!"
+
+        # compile the format to one anchored regex, the known fields as named groups
+        parsers = { parserClass.field : parserClass() for parserClass in HLogFileReader.parserClasses }
+        parsers['asctime'].setDateFormat( datefmt )
+        self.lineParsers : dict[str, HLogFileReader.parser] = {}
+        linePattern = ''
+        literalStart = 0
+        for fieldMatch in HLogFileReader.fieldRe.finditer( fmt ):
+            linePattern += re.escape( fmt[ literalStart : fieldMatch.start() ] )
+            literalStart = fieldMatch.end()
+            parser = parsers.get( fieldMatch.group( 1 ), HLogFileReader.parser() )
+            linePattern += parser.pattern()
+            if parser.field:
+                self.lineParsers[ type(parser).__name__ ] = parser
+        linePattern += re.escape( fmt[ literalStart : ] )
+        self.lineRe = re.compile( linePattern + '$' )
 
         self.lastReadEnd = 0
 
     def parseLine(self, line : str) -> dict[str,any]:
-        recordEntry : dict[str,any] = dict()
-        lineIter = iter(line)
-        c = next(lineIter)
-        for parser in self.lineParsers:
-            startIter =  copy.deepcopy( lineIter )
-            startC = c
-            try:
-                success, c, lineIter = parser.parse( c, lineIter )
-            except:
-                success = False
-
-            if success:
-                recordEntry[type(parser).__name__] = parser.value()
-            else:
-                lineIter = copy.deepcopy( startIter )
-                c = startC
-
-        return recordEntry
+        """Retrieves the field values of a record line, just the message for a continuation line"""
+        if line.endswith( '\n' ):
+            line = line[:-1]
+        lineMatch = self.lineRe.match( line )
+        if lineMatch is None:
+            return { HLogFileReader.messageParser.__name__ : line }
+        return { name : self.lineParsers[ name ].value( text ) for name, text in lineMatch.groupdict().items() }
+
+    def created( self, recordEntry : dict[str,any] )->float:
+        """Retrieves the created time of an entry, asctime with the msecs, if they are formatted"""
+        return recordEntry[HLogFileReader.asctimeParser.__name__] + \
+               recordEntry.get( HLogFileReader.msecsParser.__name__, 0 ) / 1000
 
     def makeRecord( self, recordEntry ):
-        time = recordEntry[HLogFileReader.asctimeParser.__name__]
+        time = self.created( recordEntry )
         hierarchyStage = recordEntry[HLogFileReader.hierarchyParser.__name__]
         levelName = recordEntry[HLogFileReader.levelnameParser.__name__]
         msg = recordEntry[HLogFileReader.messageParser.__name__]
@@ -473,38 +2134,1010 @@ class HLogFileReader(HLogIO):
                                         None, func, None, None)
         # replace time
         record.created = time
-        record.msecs = int((time - int(time)) * 1000) + 0.0  # from LogRecord.__init__
+        record.msecs = createdMsecs( time )
 
         # handle standard
         self.logger.handle( record )
 
 
+    def entries(self, filePath : str, seekPos : int = 0 ):
+        """
+        Iterates the parsed record entries of the logfile, without creating records
+        gzip and xz compressed files are read transparently, seekPos is a position in the decompressed text then
+        """
+        self.filePath = filePath
+        with openLogFile( filePath ) as f:
+            yield from self.fileEntries( f, seekPos )
+
+    def blockEntries(self, filePath : str, blockIndex : 'HLogBlockIndex', blockNo : int ):
+        """Iterates the parsed record entries of one block of a file written by HLogCompressedHandler"""
+        self.filePath = filePath
+        with open( filePath, 'rb' ) as f:
+            yield from self.fileEntries( io.BytesIO( blockIndex.decompress( f, blockNo ) ) )
+
+    def entriesFrom(self, filePath : str, idx : int | None = None, t : float | datetime | None = None ):
+        """
+        Iterates the parsed record entries of a file written by HLogCompressedHandler from the record idx or time t on,
+        only the blocks from the one containing it are decompressed, t is compared at the resolution of asctime,
+        without idx and t all entries are iterated
+        """
+        blockIndex = HLogBlockIndex.load( filePath )
+        if idx is not None:
+            blockNo = blockIndex.blockOfIdx( idx )
+            skip = idx - blockIndex.firstIdxs[ blockNo ] if blockNo < len( blockIndex ) else 0
+        elif t is None:
+            blockNo = 0
+            skip = 0
+        else:
+            if isinstance( t, datetime ):
+                t = t.timestamp()
+            blockNo = blockIndex.blockOfTime( t )
+            skip = 0
+        asctimeName = HLogFileReader.asctimeParser.__name__
+        for blockNo in range( blockNo, len( blockIndex ) ):
+            for recordEntry in self.blockEntries( filePath, blockIndex, blockNo ):
+                if skip > 0:
+                    skip -= 1
+                    continue
+                if t is not None and recordEntry[ asctimeName ] < int( t ):
+                    continue
+                t = None
+                yield recordEntry
+
+    def fileEntries(self, f, seekPos : int = 0, final : bool = True, endPos : int | None = None ):
+        """
+        Iterates the parsed record entries of an open binary file from seekPos up to endPos, a record start
+        lastReadEnd is the start of the next record not yet iterated, with final False the last record is held back,
+        because it may still get continuation lines, as well as a trailing partial line
+        """
+        messageName = HLogFileReader.messageParser.__name__
+        lineMatch = self.lineRe.match
+        # the values of the other fields are their texts
+        converters = [ ( name, parser.value ) for name, parser in self.lineParsers.items()
+                       if type(parser).value is not HLogFileReader.parser.value ]
+        f.seek( seekPos )
+        pos = seekPos
+        self.lastReadEnd = seekPos
+        # because of possible pure message lines, we can only complete a record, if a valid next one was received
+        lastRecordEntry : dict[str,any] = None 
+        for lineBytes in f:
+            if not final and not lineBytes.endswith( b'\n' ):
+                break
+            if endPos is not None and pos >= endPos:
+                break
+            lineStart = pos
+            pos += len( lineBytes )
+            line = lineBytes.decode( 'utf-8' )
+            if line.endswith( '\n' ):
+                line = line[:-2] if line.endswith( '\r\n' ) else line[:-1]
+            match = lineMatch( line )
+            if match is None:
+                # continuation line, the fast path
+                if lastRecordEntry is None:
+                    raise ImportError( f"{self.filePath} does not start with a record line" )
+                lastRecordEntry[ messageName ] += '\n' + line
+                continue
+            if lastRecordEntry is not None:
+                self.lastReadEnd = lineStart
+                yield lastRecordEntry
+            lastRecordEntry = match.groupdict()
+            for name, value in converters:
+                lastRecordEntry[ name ] = value( lastRecordEntry[ name ] )
+
+        if lastRecordEntry is not None and final:
+            self.lastReadEnd = pos
+            yield lastRecordEntry
+
+    def emitRecords( self, records : list[HLogRecord] )->None:
+        """Appends a batch of read records to recordingHandler and forwards it to the handlers, like Logger.callHandlers"""
+        self.recordingHandler.emitMany( records )
+        for handler in self.handlers:
+            for record in records:
+                if record.levelno >= handler.level:
+                    handler.handle( record )
+
+    def emitEntries( self, recordEntries )->int:
+        """Creates the records of recordEntries directly and emits them in batches by emitRecords, returns their count"""
+        standardFields = standardRecordFields( self.filePath )
+        loggerName = self.logger.name if self.logger is not None else os.path.basename( self.filePath )
+        hierarchyName = HLogFileReader.hierarchyParser.__name__
+        levelnameName = HLogFileReader.levelnameParser.__name__
+        messageName = HLogFileReader.messageParser.__name__
+        created = self.created
+        cnt = 0
+        records = []
+        for recordEntry in recordEntries:
+            levelName = recordEntry[ levelnameName ]
+            records.append( readRecord( standardFields, loggerName, recordEntry[ hierarchyName ],
+                                        logging._nameToLevel.get( levelName, logging.NOTSET ), levelName,
+                                        created( recordEntry ), recordEntry[ messageName ] ) )
+            if len( records ) >= self.batchSize:
+                self.emitRecords( records )
+                cnt += len( records )
+                records = []
+        if records:
+            self.emitRecords( records )
+            cnt += len( records )
+        return cnt
+
     def read(self, filePath : str, seekPos : int = 0 ) -> int:
+        """Reads the records of the logfile from seekPos on, into recordingHandler if given, otherwise handled by the logger"""
+        if self.recordingHandler is not None:
+            self.filePath = filePath
+            self.emitEntries( self.entries( filePath, seekPos ) )
+            return self.lastReadEnd
+        for recordEntry in self.entries( filePath, seekPos ):
+            self.makeRecord( recordEntry )
+        return self.lastReadEnd
+
+    def exportTrace(self, filePath : str, traceFilePath : str, format : str = 'chrome', seekPos : int = 0 )->None:
+        """
+        Converts the logfile to a trace for flame graph viewers, see HLogTraceExporter
+        the file has no message templates, for 'speedscope' the spans are named by messageTemplate instead,
+        so the frames stay few for messages differing in numbers only, 'chrome' keeps the messages
+        """
+        with HLogTraceExporter( traceFilePath, format, os.path.basename( filePath ) ) as exporter:
+            for recordEntry in self.entries( filePath, seekPos ):
+                message = recordEntry.get( HLogFileReader.messageParser.__name__, '' )
+                name = messageTemplate( message ) if format == 'speedscope' else message.split( '\n' )[0]
+                exporter.addSpan( name, recordEntry[ HLogFileReader.hierarchyParser.__name__ ],
+                                  self.created( recordEntry ) * 1000000 )
+
+    def chunkBoundaries(self, filePath : str, cntChunks : int )->list[int]:
+        """
+        Splits the file into about equally sized byte ranges, aligned to the record lines,
+        so continuation lines stay with their record, retrieves the starts and the file size
+        """
+        size = os.path.getsize( filePath )
+        boundaries = [ 0 ]
+        with open( filePath, 'rb' ) as f:
+            for chunk in range( 1, cntChunks ):
+                pos = max( size * chunk // cntChunks, boundaries[-1] + 1 )
+                # continue at the start of the next line
+                f.seek( pos - 1 )
+                pos += len( f.readline() ) - 1
+                while True:
+                    line = f.readline()
+                    if not len( line ):
+                        break
+                    if self.lineRe.match( line.decode( 'utf-8' ).rstrip( '\r\n' ) ):
+                        boundaries.append( pos )
+                        break
+                    pos += len( line )
+                if pos >= size:
+                    break
+        boundaries.append( size )
+        return boundaries
+
+    def readParallel(self, filePath : str, recordingHandler : RecordingHandler | None = None,
+                     maxWorkers : int | None = None, cntChunks : int | None = None ) -> int:
+        """
+        Like read, but the chunks of chunkBoundaries are parsed by a ProcessPoolExecutor
+        the records are merged in file order, into recordingHandler by emitMany if given, otherwise handled by the logger
+        """
+        self.filePath = filePath
+        if recordingHandler is None:
+            recordingHandler = self.recordingHandler
+        if cntChunks is None:
+            cntChunks = 4 * ( maxWorkers or os.cpu_count() or 1 )
+        boundaries = self.chunkBoundaries( filePath, cntChunks )
+        standardFields = standardRecordFields( filePath )
+        loggerName = self.logger.name if self.logger is not None else os.path.basename( filePath )
+        levelNames = {}
+        with concurrent.futures.ProcessPoolExecutor( maxWorkers ) as executor:
+            chunks = executor.map( parseLogChunk, itertools.repeat( self.fmt ), itertools.repeat( self.datefmt ),
+                                   itertools.repeat( filePath ), boundaries[:-1], boundaries[1:] )
+            for hierarchyStages, levelNos, createds, messages in chunks:
+                if recordingHandler is None:
+                    for recordEntry in zip( hierarchyStages, levelNos, createds, messages ):
+                        self.makeRecord( { HLogFileReader.hierarchyParser.__name__ : recordEntry[0],
+                                           HLogFileReader.levelnameParser.__name__ : logging.getLevelName( recordEntry[1] ),
+                                           HLogFileReader.asctimeParser.__name__ : recordEntry[2],
+                                           HLogFileReader.messageParser.__name__ : recordEntry[3] } )
+                    continue
+                records = []
+                for hierarchyStage, levelNo, created, message in zip( hierarchyStages, levelNos, createds, messages ):
+                    levelName = levelNames.get( levelNo )
+                    if levelName is None:
+                        levelName = levelNames[ levelNo ] = logging.getLevelName( levelNo )
+                    records.append( readRecord( standardFields, loggerName, hierarchyStage, levelNo, levelName, created, message ) )
+                if recordingHandler is self.recordingHandler:
+                    self.emitRecords( records )
+                else:
+                    recordingHandler.emitMany( records )
+        self.lastReadEnd = boundaries[-1]
+        return self.lastReadEnd
+
+    def startFollow(self, filePath : str )->None:
+        """Starts following filePath, the records are read by poll, the file may not exist yet"""
+        self.stopFollow()
         self.filePath = filePath
-        with open( filePath ) as f:
-            f.seek( seekPos )
-            # because of possible pure message lines, we can only complete a record, if a valid next one was received
-            lastRecordEntry : dict[str,any] = None 
+        self.followFile = None
+        self.followSize = -1
+        self.lastReadEnd = 0
+
+    def stopFollow(self)->None:
+        if getattr( self, 'followFile', None ) is not None:
+            self.followFile.close()
+        self.followFile = None
+
+    def readFollowed(self, final : bool )->int:
+        """Reads the complete records after lastReadEnd of the followed file"""
+        if self.recordingHandler is not None:
+            return self.emitEntries( self.fileEntries( self.followFile, self.lastReadEnd, final ) )
+        cnt = 0
+        for recordEntry in self.fileEntries( self.followFile, self.lastReadEnd, final ):
+            self.makeRecord( recordEntry )
+            cnt += 1
+        return cnt
+
+    def poll(self)->int:
+        """
+        Reads the records appended to the followed file since the last poll, returns their count
+        only the sizes are compared, if nothing changed, the last record is held back until its successor arrives
+        a rotated file (another inode at filePath) is read to its end before the new one is read from its start,
+        a truncated file is read from its start after calling fileTruncated
+        """
+        cnt = 0
+        try:
+            pathStat = os.stat( self.filePath )
+        except FileNotFoundError:
+            pathStat = None
+        if self.followFile is not None:
+            fileStat = os.fstat( self.followFile.fileno() )
+            if pathStat is not None and ( pathStat.st_ino, pathStat.st_dev ) != ( fileStat.st_ino, fileStat.st_dev ):
+                cnt += self.readFollowed( True )
+                self.stopFollow()
+            elif fileStat.st_size < self.followSize:
+                self.lastReadEnd = 0
+                self.fileTruncated( self.filePath )
+            elif fileStat.st_size == self.followSize:
+                return cnt
+            else:
+                self.followSize = fileStat.st_size
+                return cnt + self.readFollowed( False )
+        if self.followFile is None and pathStat is not None:
+            self.followFile = open( self.filePath, 'rb' )
+            self.lastReadEnd = 0
+        if self.followFile is not None:
+            self.followSize = os.fstat( self.followFile.fileno() ).st_size
+            cnt += self.readFollowed( False )
+        return cnt
+
+    def fileTruncated(self, filePath : str )->None:
+        """Notification about a truncated followed file, to be overridden, e.g. to clear a view"""
+        pass
+
+    def follow(self, filePath : str, interval : float = 1.0, stopEvent : threading.Event | None = None )->None:
+        """
+        Reads filePath and keeps polling it every interval seconds for new records, until stopEvent is set
+        the records are handled by the logger in the calling thread, Tk views have to call poll from the mainloop instead
+        """
+        self.startFollow( filePath )
+        if stopEvent is None:
+            stopEvent = threading.Event()
+        try:
             while True:
-                line = f.readline()
-                if line is None or len(line) <= 0:
+                self.poll()
+                if stopEvent.wait( interval ):
                     break
-                recordEntry = self.parseLine( line )
-                keys = recordEntry.keys()
-                if HLogFileReader.hierarchyParser.__name__ in keys:
-                    if lastRecordEntry is not None:
-                        self.makeRecord( lastRecordEntry )
-                        self.lastReadEnd = f.tell()
-                    lastRecordEntry = recordEntry
-                elif HLogFileReader.messageParser.__name__ in keys:
-                    lastRecordEntry[HLogFileReader.messageParser.__name__] += '\n' + recordEntry[HLogFileReader.messageParser.__name__]
-                else:
-                    raise ImportError
+        finally:
+            self.stopFollow()
 
-            if lastRecordEntry is not None:
-                self.makeRecord( lastRecordEntry )
-                self.lastReadEnd = f.tell()
+   
+def parseLogChunk( fmt : str, datefmt : str, filePath : str, startPos : int, endPos : int ):
+    """
+    Parses the records from startPos to endPos of a logfile in a worker process of HLogFileReader.readParallel
+    retrieves the columns hierarchyStages, levelNos, createds and messages, cheap to be returned to the caller
+    """
+    fileReader = HLogFileReader( None, fmt, datefmt )
+    fileReader.filePath = filePath
+    hierarchyStages = array( 'i' )
+    levelNos = array( 'i' )
+    createds = array( 'd' )
+    messages = []
+    with open( filePath, 'rb' ) as f:
+        for recordEntry in fileReader.fileEntries( f, startPos, True, endPos ):
+            hierarchyStages.append( recordEntry[ HLogFileReader.hierarchyParser.__name__ ] )
+            levelNos.append( logging._nameToLevel.get( recordEntry[ HLogFileReader.levelnameParser.__name__ ], logging.NOTSET ) )
+            createds.append( fileReader.created( recordEntry ) )
+            messages.append( recordEntry[ HLogFileReader.messageParser.__name__ ] )
+    return hierarchyStages, levelNos, createds, messages
+
+def scanLogChunk( fmt : str, datefmt : str, filePath : str, startPos : int, endPos : int ):
+    """
+    Indexes the record lines from startPos to endPos of a logfile for HLogFileModel, in a worker process if parallel
+    retrieves the columns offsets, hierarchyStages, levelNos and createds
+    """
+    fileReader = HLogFileReader( None, fmt, datefmt )
+    lineRe = re.compile( b'^' + fileReader.lineRe.pattern.encode( 'utf-8' ), re.MULTILINE )
+    hierarchyName = HLogFileReader.hierarchyParser.__name__
+    asctimeParser = fileReader.lineParsers[ HLogFileReader.asctimeParser.__name__ ]
+    levelnameName = HLogFileReader.levelnameParser.__name__
+    asctimeName = HLogFileReader.asctimeParser.__name__
+    msecsName = HLogFileReader.msecsParser.__name__ if HLogFileReader.msecsParser.__name__ in fileReader.lineParsers else None
+    offsets = array( 'q' )
+    hierarchyStages = array( 'i' )
+    levelNos = array( 'i' )
+    createds = array( 'd' )
+    levelNoByName : dict[bytes,int] = {}
+    lastAscTime = None
+    created = 0.0
+    with open( filePath, 'rb' ) as f:
+        if endPos <= startPos:
+            return offsets, hierarchyStages, levelNos, createds
+        fileMap = mmap.mmap( f.fileno(), 0, access=mmap.ACCESS_READ )
+        try:
+            for match in lineRe.finditer( fileMap, startPos, endPos ):
+                offsets.append( match.start() )
+                hierarchyStages.append( match.end( hierarchyName ) - match.start( hierarchyName ) )
+                levelName = match.group( levelnameName )
+                levelNo = levelNoByName.get( levelName )
+                if levelNo is None:
+                    levelNo = levelNoByName[ levelName ] = logging._nameToLevel.get( levelName.decode( 'utf-8' ), logging.NOTSET )
+                levelNos.append( levelNo )
+                ascTime = match.group( asctimeName )
+                if ascTime != lastAscTime:
+                    created = asctimeParser.value( ascTime.decode( 'utf-8' ) )
+                    lastAscTime = ascTime
+                createds.append( created if msecsName is None else created + int( match.group( msecsName ) ) / 1000 )
+            # the match keeps the map exported
+            match = None
+        finally:
+            fileMap.close()
+    return offsets, hierarchyStages, levelNos, createds
+
+class MappedRecordStore():
+    """
+    record store of a HLogFileModel, the indexed fields are columns of the scan of the memory mapped logfile,
+    the records are parsed from their text on access and kept like in ColumnarRecordStore
+    """
+
+    def __init__(self, fileMap, fileReader : HLogFileReader, loggerName : str )->None:
+        self.fileMap = fileMap
+        self.fileReader = fileReader
+        self.loggerName = loggerName
+        self.offsets = array( 'q' )
+        """file offset of the first line per record"""
+        self.hierarchyStages = array( 'i' )
+        self.levelNos = array( 'i' )
+        self.createds = array( 'd' )
+        self.subtreeMaxLevelNos = array( 'i' )
+        """subtree max levelno column of the HLogFileModel"""
+        self.materialized : dict[int, HLogRecord] = {}
+        self.count = 0
+
+    def append(self, record : HLogRecord)->None:
+        """The fields are indexed by the scan already, appending makes the next record visible"""
+        self.count += 1
+
+    def textAt(self, relIdx : int)->str:
+        end = self.offsets[ relIdx + 1 ] if relIdx + 1 < len( self.offsets ) else len( self.fileMap )
+        return self.fileMap[ self.offsets[ relIdx ] : end ].decode( 'utf-8' )
+
+    def materialize(self, relIdx : int)->HLogRecord:
+        created = self.createds[ relIdx ]
+        levelNo = self.levelNos[ relIdx ]
+        message = self.messageAt( relIdx )
+        return makeHLogRecord( { 'name' : self.loggerName,
+                                        'levelno' : levelNo, 'levelname' : logging.getLevelName( levelNo ),
+                                        'msg' : message, 'message' : message, 'args' : None,
+                                        'created' : created, 'msecs' : createdMsecs( created ),
+                                        'relativeCreated' : (created - logging._startTime) * 1000,
+                                        'hierarchyStage' : self.hierarchyStages[ relIdx ], 'idx' : relIdx,
+                                        'showSubrecords' : None,
+                                        'maxChildLevelNo' : self.maxChildLevelNoAt( relIdx ) } )
+
+    def maxChildLevelNoAt(self, relIdx : int)->int:
+        subtreeMaxLevelNo = self.subtreeMaxLevelNos[ relIdx ]
+        return subtreeMaxLevelNo if subtreeMaxLevelNo > self.levelNos[ relIdx ] else -1
+
+    def __getitem__(self, relIdx : int)->HLogRecord:
+        if relIdx < 0:
+            relIdx += len( self )
+        if relIdx < 0 or relIdx >= len( self ):
+            raise IndexError( "MappedRecordStore index out of range" )
+        record = self.materialized.get( relIdx )
+        if record is None:
+            record = self.materialized[ relIdx ] = self.materialize( relIdx )
+        return record
+
+    def __len__(self)->int:
+        return self.count
+
+    def __iter__(self):
+        for relIdx in range( len( self ) ):
+            yield self[ relIdx ]
+
+    def hierarchyStageAt(self, relIdx : int)->int:
+        return self.hierarchyStages[ relIdx ]
+
+    def levelNoAt(self, relIdx : int)->int:
+        return self.levelNos[ relIdx ]
+
+    def createdAt(self, relIdx : int)->float:
+        return self.createds[ relIdx ]
+
+    def loggerNameAt(self, relIdx : int)->str:
+        return self.loggerName
+
+    def setMaxChildLevelNo(self, relIdx : int, maxChildLevelNo : int)->None:
+        """The value is kept by the subtree max levelno column"""
+        record = self.materialized.get( relIdx )
+        if record is not None:
+            record.maxChildLevelNo = maxChildLevelNo
+
+    def templateAt(self, relIdx : int)->str:
+        """The file has no templates, see messageTemplate"""
+        return messageTemplate( self.messageAt( relIdx ) )
+
+    def spanAt(self, relIdx : int)->HLogSpan | None:
+        return None
+
+    def messageAt(self, relIdx : int)->str:
+        lines = self.textAt( relIdx ).splitlines()
+        recordEntry = self.fileReader.parseLine( lines[0] )
+        return '\n'.join( [ recordEntry[ HLogFileReader.messageParser.__name__ ] ] + lines[1:] )
+
+    def columns(self)->dict[str,any]:
+        """Retrieves the indexed columns, offset refers to the logfile instead of parsed messages"""
+        return { 'levelno' : self.levelNos[ : self.count ], 'hierarchyStage' : self.hierarchyStages[ : self.count ],
+                 'created' : self.createds[ : self.count ], 'offset' : self.offsets[ : self.count ] }
+
+    def clear(self)->None:
+        self.materialized.clear()
+        self.count = 0
+
+class HLogFileModel( RecordingHandler ):
+    """
+    read only RecordingHandler over a memory mapped logfile written by HLogFormatter, for files too large to be read
+    one scan indexes offset, hierarchyStage, levelno and created per record, the hierarchy index is built from them,
+    the text of a record is parsed only if the record or its message is accessed
+    the query API of RecordingHandler (at, parentIdx, getFilteredChildren, idxAtTime ...) works as usual
+    with sidecar the index is kept in filePath.hidx, reopening loads it and scans only the lines appended since
+    """
+
+    filterCacheClass = LazyRingBuffer
+    """the filter caches are allocated by the first filtered access, the range max tree by the first range query"""
+    filterCntTypecode = 'i'
+    levelNoTreeClass = LazyRangeMaxTree
 
+    indexMagic = b'HLOGHIDX'
+    indexVersion = 1
+    indexHeader = struct.Struct( '<8sIq16s16s16sq' )
+    """magic, version, indexed size, format hash, head hash, tail hash, count of records"""
+    indexHashSize = 65536
+    """count of bytes hashed at the head and before the indexed size"""
+
+    def __init__(self, filePath : str, fmt : str, datefmt : str ='%y-%m-%d %H:%M:%S', maxWorkers : int = 1,
+                 sidecar : bool = True )->None:
+        self.filePath = filePath
+        self.fileReader = HLogFileReader( None, fmt, datefmt )
+        self.file = open( filePath, 'rb' )
+        fileMap = b''
+        if os.fstat( self.file.fileno() ).st_size:
+            fileMap = mmap.mmap( self.file.fileno(), 0, access=mmap.ACCESS_READ )
+        store = MappedRecordStore( fileMap, self.fileReader, os.path.basename( filePath ) )
+        # a trailing partial line is left for the next time
+        self.indexedSize = fileMap.rfind( b'\n' ) + 1
+
+        index = self.loadIndex( fileMap ) if sidecar else None
+        self.cntLoaded = 0
+        """count of records loaded from the sidecar index"""
+        loadedSize = 0
+        if index is not None:
+            loadedSize, columns = index
+            self.cntLoaded = len( columns[0] )
+            store.offsets, store.hierarchyStages, store.levelNos, store.createds = columns[:4]
+            self.scanChunks( store, [ scanLogChunk( fmt, datefmt, filePath, loadedSize, self.indexedSize ) ] )
+        else:
+            self.scan( store, maxWorkers )
+
+        RecordingHandler.__init__( self, max( 1, len( store.offsets ) ) )
+        self.records = store
+        if index is not None:
+            for column, loaded in zip( self.hierarchyColumns(), index[1][4:] ):
+                column.items[ : self.cntLoaded ] = loaded
+        store.subtreeMaxLevelNos = self.subtreeMaxLevelNos.items
+        self.buildIndex( self.cntLoaded )
+        if sidecar and loadedSize != self.indexedSize:
+            self.saveIndex()
+
+    def hierarchyColumns(self)->list[RingBuffer]:
+        """The columns of the hierarchy index kept in the sidecar"""
+        return [ self.parentIdxs, self.subtreeEndIdxs, self.nextSiblingIdxs, self.subtreeMaxLevelNos ]
+
+    def indexPath(self)->str:
+        return self.filePath + '.hidx'
+
+    def indexHeaderFor(self, fileMap, indexedSize : int, count : int )->bytes:
+        """Retrieves the header keying the index to the first indexedSize bytes of the file"""
+        formatHash = hashlib.blake2b( ( self.fileReader.fmt + '\0' + self.fileReader.datefmt ).encode( 'utf-8' ),
+                                      digest_size=16 ).digest()
+        headHash = hashlib.blake2b( fileMap[ : min( self.indexHashSize, indexedSize ) ], digest_size=16 ).digest()
+        tailHash = hashlib.blake2b( fileMap[ max( 0, indexedSize - self.indexHashSize ) : indexedSize ],
+                                    digest_size=16 ).digest()
+        return self.indexHeader.pack( self.indexMagic, self.indexVersion, indexedSize, formatHash, headHash, tailHash,
+                                      count )
+
+    def loadIndex(self, fileMap ):
+        """
+        Retrieves the indexed size and the columns of a valid sidecar index, None if there is none,
+        it is valid as long as the indexed part of the file is unchanged, so the file may have been appended
+        """
+        try:
+            with open( self.indexPath(), 'rb' ) as f:
+                header = f.read( self.indexHeader.size )
+                if len( header ) != self.indexHeader.size:
+                    return None
+                magic, version, indexedSize, formatHash, headHash, tailHash, count = self.indexHeader.unpack( header )
+                if magic != self.indexMagic or version != self.indexVersion or indexedSize > self.indexedSize or \
+                   header != self.indexHeaderFor( fileMap, indexedSize, count ):
+                    return None
+                columns = [ array( typecode ) for typecode in 'qiidqqqi' ]
+                if count:
+                    indexMap = mmap.mmap( f.fileno(), 0, access=mmap.ACCESS_READ )
+                    try:
+                        pos = self.indexHeader.size
+                        for column in columns:
+                            column.frombytes( indexMap[ pos : pos + count * column.itemsize ] )
+                            pos += count * column.itemsize
+                    finally:
+                        indexMap.close()
+                if any( len( column ) != count for column in columns ):
+                    return None
+                return indexedSize, columns
+        except OSError:
+            return None
+
+    def saveIndex(self)->None:
+        """Writes the sidecar index, a not writable location is skipped"""
+        store = self.records
+        count = len( store.offsets )
+        tempPath = self.indexPath() + '.tmp'
+        try:
+            with open( tempPath, 'wb' ) as f:
+                f.write( self.indexHeaderFor( store.fileMap, self.indexedSize, count ) )
+                for column in [ store.offsets, store.hierarchyStages, store.levelNos, store.createds ] + \
+                              [ column.items for column in self.hierarchyColumns() ]:
+                    f.write( memoryview( column )[ : count ] )
+            os.replace( tempPath, self.indexPath() )
+        except OSError:
+            pass
+
+    def scan(self, store : MappedRecordStore, maxWorkers : int = 1 )->None:
+        """
+        Indexes the record lines of the file in store, continuation lines are skipped by the regex
+        with maxWorkers > 1 the chunks of HLogFileReader.chunkBoundaries are scanned by a ProcessPoolExecutor
+        """
+        args = ( self.fileReader.fmt, self.fileReader.datefmt, self.filePath )
+        if maxWorkers <= 1:
+            chunks = [ scanLogChunk( *args, 0, self.indexedSize ) ]
+            self.scanChunks( store, chunks )
+            return
+        boundaries = self.fileReader.chunkBoundaries( self.filePath, 4 * maxWorkers )
+        with concurrent.futures.ProcessPoolExecutor( maxWorkers ) as executor:
+            self.scanChunks( store, executor.map( scanLogChunk, *[ itertools.repeat( arg ) for arg in args ],
+                                                  boundaries[:-1], boundaries[1:-1] + [ self.indexedSize ] ) )
+
+    def scanChunks(self, store : MappedRecordStore, chunks )->None:
+        """Appends the columns of the scanned chunks in file order"""
+        for offsets, hierarchyStages, levelNos, createds in chunks:
+            store.offsets += offsets
+            store.hierarchyStages += hierarchyStages
+            store.levelNos += levelNos
+            store.createds += createds
+
+    def buildIndex(self, fromIdx : int = 0 )->None:
+        """
+        Builds the hierarchy index for the scanned records from fromIdx at once, like appendRecord does one by one
+        the index of the records before fromIdx is complete, the subtrees still open are their last record's ancestors
+        """
+        store = self.records
+        count = len( store.offsets )
+        stages = store.hierarchyStages
+        parentIdxs = self.parentIdxs.items
+        subtreeEndIdxs = self.subtreeEndIdxs.items
+        nextSiblingIdxs = self.nextSiblingIdxs.items
+        openIdxs = []
+        idx = fromIdx - 1
+        while idx >= 0:
+            openIdxs.append( idx )
+            idx = parentIdxs[ idx ]
+        openAncestors = self.openAncestors
+        openAncestors[:] = [ ( stages[ idx ], idx ) for idx in reversed( openIdxs ) ]
+        for idx in range( fromIdx, count ):
+            hierarchyStage = stages[ idx ]
+            closedIdx = -1
+            while len( openAncestors ) and openAncestors[-1][0] >= hierarchyStage:
+                closedIdx = openAncestors.pop()[1]
+                subtreeEndIdxs[ closedIdx ] = idx - 1
+            parentIdx = -1
+            if hierarchyStage > 0 and len( openAncestors ):
+                parentIdx = openAncestors[-1][1]
+            openAncestors.append( (hierarchyStage, idx) )
+            if closedIdx >= 0 and parentIdxs[ closedIdx ] == parentIdx:
+                nextSiblingIdxs[ closedIdx ] = idx
+            parentIdxs[ idx ] = parentIdx
+
+        # the descendants have higher idxs, so one backward pass raises all subtree max levelnos,
+        # of the records before fromIdx only the formerly open ones can get new descendants
+        levelNos = store.levelNos
+        subtreeMaxLevelNos = self.subtreeMaxLevelNos.items
+        for idx in itertools.chain( range( count - 1, fromIdx - 1, -1 ), openIdxs ):
+            parentIdx = parentIdxs[ idx ]
+            if parentIdx >= 0:
+                levelNo = max( levelNos[ idx ], subtreeMaxLevelNos[ idx ] )
+                if levelNo > subtreeMaxLevelNos[ parentIdx ]:
+                    subtreeMaxLevelNos[ parentIdx ] = levelNo
+        self.levelNos.values = levelNos
+        self.levelNos.clear()
+
+        for column in [ self.parentIdxs, self.subtreeEndIdxs, self.nextSiblingIdxs, self.subtreeMaxLevelNos,
+                        self.filteredChildCnts, self.filteredChildCntGenerations, self.recordFilterResults ]:
+            column.count = count
+        store.count = count
+        self.entireAdded = count
+
+        createds = store.createds
+        if any( createds[ idx ] > createds[ idx + 1 ] for idx in range( count - 1 ) ):
+            self.createdMonotonic = False
+            self.createdOrder = sorted( zip( createds, range( count ) ) )
+
+    def subtreeMaxLevelNo(self, idx : int )->int:
+        """Retrieved from the column filled by buildIndex, without the range max tree"""
+        return self.subtreeMaxLevelNos[ idx ]
+
+    def emit(self, record : HLogRecord )->None:
+        """The model is read only"""
+        pass
+
+    def emitMany(self, records : list[HLogRecord], respectLevel : bool = True )->None:
+        pass
+
+    def close(self)->None:
+        self.records.materialized.clear()
+        if isinstance( self.records.fileMap, mmap.mmap ):
+            self.records.fileMap.close()
+        self.file.close()
+        RecordingHandler.close( self )
+
+class HLogBlockIndex():
+    """
+    block index of a file written by HLogCompressedHandler, kept in filePath.bidx,
+    an entry per block with its compressed offset and length, the idx of its first record, its count of records and
+    the created time of its first and last record
+    """
+    magic = b'HLOGBIDX'
+    entryStruct = struct.Struct( '<qqqqdd' )
+
+    def __init__(self, compression : str = 'gzip' )->None:
+        self.compression = compression
+        self.offsets : list[int] = []
+        self.lengths : list[int] = []
+        self.firstIdxs : list[int] = []
+        self.cnts : list[int] = []
+        self.firstCreateds : list[float] = []
+        self.lastCreateds : list[float] = []
+
+    def __len__(self)->int:
+        return len( self.offsets )
+
+    @staticmethod
+    def indexPath( filePath : str )->str:
+        return filePath + '.bidx'
+
+    @staticmethod
+    def load( filePath : str )->'HLogBlockIndex':
+        with open( HLogBlockIndex.indexPath( filePath ), 'rb' ) as f:
+            data = f.read()
+        if not data.startswith( HLogBlockIndex.magic ):
+            raise ImportError( f"{filePath} has no block index" )
+        blockIndex = HLogBlockIndex( data[ len( HLogBlockIndex.magic ) : len( HLogBlockIndex.magic ) + 4 ].decode( 'ascii' ).strip() )
+        pos = len( HLogBlockIndex.magic ) + 4
+        # a partially written last entry is ignored
+        while pos + HLogBlockIndex.entryStruct.size <= len( data ):
+            blockIndex.add( *HLogBlockIndex.entryStruct.unpack_from( data, pos ) )
+            pos += HLogBlockIndex.entryStruct.size
+        return blockIndex
+
+    def header(self)->bytes:
+        return self.magic + self.compression.encode( 'ascii' )[:4].ljust( 4 )
+
+    def add(self, offset : int, length : int, firstIdx : int, cnt : int, firstCreated : float, lastCreated : float )->bytes:
+        """Adds a block, retrieves its entry"""
+        self.offsets.append( offset )
+        self.lengths.append( length )
+        self.firstIdxs.append( firstIdx )
+        self.cnts.append( cnt )
+        self.firstCreateds.append( firstCreated )
+        self.lastCreateds.append( lastCreated )
+        return self.entryStruct.pack( offset, length, firstIdx, cnt, firstCreated, lastCreated )
+
+    def blockOfIdx(self, idx : int )->int:
+        """Retrieves the block containing the record idx, len for none"""
+        blockNo = bisect.bisect_right( self.firstIdxs, idx ) - 1
+        if blockNo < 0 or idx >= self.firstIdxs[ blockNo ] + self.cnts[ blockNo ]:
+            return len( self )
+        return blockNo
+
+    def blockOfTime(self, t : float )->int:
+        """Retrieves the first block with records created at t or later, blocks are assumed in created order"""
+        return bisect.bisect_left( self.lastCreateds, int( t ) )
+
+    def decompress(self, f, blockNo : int )->bytes:
+        f.seek( self.offsets[ blockNo ] )
+        data = f.read( self.lengths[ blockNo ] )
+        if self.compression == 'xz':
+            return lzma.decompress( data )
+        return gzip.decompress( data )
+
+class HLogCompressedHandler( logging.Handler ):
+    """
+    writes the formatted records (usually by HLogFormatter) compressed, in blocks of about blockSize text bytes,
+    every block is a complete gzip member or xz stream, so the file is a valid .gz/.xz file as a whole,
+    and every block can be decompressed on its own, located by the HLogBlockIndex in filePath.bidx
+    """
+
+    def __init__(self, filePath : str, compression : str = 'gzip', blockSize : int = 1 << 20 )->None:
+        assert compression in [ 'gzip', 'xz' ]
+        logging.Handler.__init__(self)
+        self.file = open( filePath, 'wb' )
+        self.blockIndex = HLogBlockIndex( compression )
+        self.indexFile = open( HLogBlockIndex.indexPath( filePath ), 'wb' )
+        self.indexFile.write( self.blockIndex.header() )
+        self.blockSize = blockSize
+        self.block : list[bytes] = []
+        self.blockLen = 0
+        self.cntRecords = 0
+        self.blockFirstCreated = 0.0
+        self.blockLastCreated = 0.0
+
+    def emit(self, record : HLogRecord )->None:
+        try:
+            text = ( self.format( record ) + '\n' ).encode( 'utf-8' )
+            self.acquire()
+            try:
+                if not len( self.block ):
+                    self.blockFirstCreated = record.created
+                self.blockLastCreated = record.created
+                self.block.append( text )
+                self.blockLen += len( text )
+                if self.blockLen >= self.blockSize:
+                    self.writeBlock()
+            finally:
+                self.release()
+        except Exception:
+            self.handleError( record )
+
+    def writeBlock(self)->None:
+        """Writes the pending records as a block"""
+        if not len( self.block ) or self.file is None:
+            return
+        data = b''.join( self.block )
+        if self.blockIndex.compression == 'xz':
+            data = lzma.compress( data, format=lzma.FORMAT_XZ )
+        else:
+            data = gzip.compress( data )
+        offset = self.file.tell()
+        self.file.write( data )
+        self.file.flush()
+        self.indexFile.write( self.blockIndex.add( offset, len( data ), self.cntRecords, len( self.block ),
+                                                   self.blockFirstCreated, self.blockLastCreated ) )
+        self.indexFile.flush()
+        self.cntRecords += len( self.block )
+        self.block = []
+        self.blockLen = 0
+
+    def flush(self)->None:
+        """Writes the pending records as a block, so frequent flushes lead to small blocks"""
+        self.acquire()
+        try:
+            self.writeBlock()
+        finally:
+            self.release()
+
+    def close(self)->None:
+        self.acquire()
+        try:
+            if self.file is not None:
+                self.writeBlock()
+                self.file.close()
+                self.indexFile.close()
+                self.file = None
+        finally:
+            self.release()
+            logging.Handler.close(self)
+
+def encodeVarint( value : int, out : bytearray )->None:
+    """Appends an unsigned LEB128 varint"""
+    while value >= 0x80:
+        out.append( ( value & 0x7f ) | 0x80 )
+        value >>= 7
+    out.append( value )
+
+def decodeVarint( data, pos : int )->tuple[int,int]:
+    """Retrieves an unsigned LEB128 varint and the pos after it"""
+    value = data[ pos ]
+    pos += 1
+    if value < 0x80:
+        return value, pos
+    value &= 0x7f
+    shift = 7
+    while True:
+        byte = data[ pos ]
+        pos += 1
+        value |= ( byte & 0x7f ) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+class HLogBinaryIO():
+    """
+    the compact binary hierarchical log, a magic followed by length prefixed frames
+      string frame: type 0, utf-8 text, the strings get consecutive ids in file order
+      record frame: type 1, zigzag idx delta, hierarchyStage, levelno, created in ns (int64), logger name id,
+                    template id, then the message text if it differs from the template (args or exception)
+    all numbers except created are varints, logger names and templates are interned by string frames
+    """
+    magic = b'HLOGBIN1'
+    stringFrame = 0
+    recordFrame = 1
+    createdStruct = struct.Struct( '<q' )
+
+class HLogBinaryHandler( HLogBinaryIO, logging.Handler ):
+    """Writes the records as compact binary hierarchical log, to be loaded by HLogBinaryReader"""
+
+    def __init__(self, filePath : str )->None:
+        logging.Handler.__init__(self)
+        self.file = open( filePath, 'wb' )
+        self.file.write( self.magic )
+        self.strings : dict[str,int] = {}
+        self.lastIdx = -1
+
+    def intern(self, text : str, out : bytearray )->int:
+        """Retrieves the id of text, a string frame is added to out for a new one"""
+        id = self.strings.get( text )
+        if id is None:
+            id = self.strings[ text ] = len( self.strings )
+            textBytes = text.encode( 'utf-8' )
+            encodeVarint( len( textBytes ) + 1, out )
+            out.append( self.stringFrame )
+            out += textBytes
+        return id
+
+    def emit(self, record : HLogRecord )->None:
+        try:
+            out = bytearray()
+            loggerNameId = self.intern( record.name, out )
+            template = str( record.msg )
+            templateId = self.intern( template, out )
+            message = record.getMessage()
+            if record.exc_info and not record.exc_text:
+                record.exc_text = logging.Formatter().formatException( record.exc_info )
+            if record.exc_text:
+                message += '\n' + record.exc_text
+
+            idx = getattr( record, 'idx', -1 )
+            if idx < 0:
+                idx = self.lastIdx + 1
+            idxDelta = idx - self.lastIdx
+            self.lastIdx = idx
+
+            frame = bytearray()
+            frame.append( self.recordFrame )
+            encodeVarint( ( idxDelta << 1 ) ^ ( idxDelta >> 63 ), frame )
+            encodeVarint( max( 0, record.hierarchyStage ), frame )
+            encodeVarint( record.levelno, frame )
+            frame += self.createdStruct.pack( round( record.created * 1000000000 ) )
+            encodeVarint( loggerNameId, frame )
+            encodeVarint( templateId, frame )
+            if message != template:
+                frame += message.encode( 'utf-8' )
+            encodeVarint( len( frame ), out )
+            out += frame
+
+            self.acquire()
+            try:
+                self.file.write( out )
+            finally:
+                self.release()
+        except Exception:
+            self.handleError( record )
+
+    def flush(self)->None:
+        self.acquire()
+        try:
+            if self.file:
+                self.file.flush()
+        finally:
+            self.release()
+
+    def close(self)->None:
+        self.acquire()
+        try:
+            if self.file:
+                self.file.close()
+                self.file = None
+        finally:
+            self.release()
+            logging.Handler.close(self)
+
+class HLogBinaryReader( HLogBinaryIO ):
+    """Reads a binary hierarchical log written by HLogBinaryHandler"""
+
+    def __init__(self)->None:
+        self.lastReadEnd = 0
+
+    def records(self, filePath : str ):
+        """
+        Iterates the records of the file, complete frames only, so a file being written can be read
+        the records keep the idx they had when written, including the gaps of records not written
+        """
+        with open( filePath, 'rb' ) as f:
+            data = f.read()
+        if not data.startswith( self.magic ):
+            raise ImportError( f"{filePath} is no binary hierarchical log" )
+
+        standardFields = standardRecordFields( filePath )
+        levelNames = {}
+        strings : list[str] = []
+        createdUnpack = self.createdStruct.unpack_from
+        startTime = logging._startTime
+        dataLen = len( data )
+        pos = len( self.magic )
+        idx = -1
+        while pos < dataLen:
+            try:
+                frameLen, framePos = decodeVarint( data, pos )
+            except IndexError:
+                break
+            frameEnd = framePos + frameLen
+            if frameEnd > dataLen:
+                break
+            pos = frameEnd
+            if data[ framePos ] == self.stringFrame:
+                strings.append( data[ framePos + 1 : frameEnd ].decode( 'utf-8' ) )
+                continue
+
+            idxDelta, framePos = decodeVarint( data, framePos + 1 )
+            idx += ( idxDelta >> 1 ) ^ -( idxDelta & 1 )
+            hierarchyStage, framePos = decodeVarint( data, framePos )
+            levelNo, framePos = decodeVarint( data, framePos )
+            createdNs = createdUnpack( data, framePos )[0]
+            loggerNameId, framePos = decodeVarint( data, framePos + 8 )
+            templateId, framePos = decodeVarint( data, framePos )
+            message = data[ framePos : frameEnd ].decode( 'utf-8' ) if framePos < frameEnd else strings[ templateId ]
+            levelName = levelNames.get( levelNo )
+            if levelName is None:
+                levelName = levelNames[ levelNo ] = logging.getLevelName( levelNo )
+
+            created = createdNs / 1000000000
+            record = HLogRecord.__new__( HLogRecord )
+            fields = standardFields.copy()
+            fields.update( { 'name' : strings[ loggerNameId ], 'msg' : message, 'levelname' : levelName,
+                             'levelno' : levelNo, 'created' : created,
+                             'msecs' : createdMsecs( created ),
+                             'relativeCreated' : (created - startTime) * 1000, 'hierarchyStage' : hierarchyStage,
+                             'idx' : idx } )
+            record.__dict__ = fields
+            self.lastReadEnd = frameEnd
+            yield record
+
+    def read(self, filePath : str, recordingHandler : RecordingHandler, batchSize : int = 10000 ) -> int:
+        """Loads the file into recordingHandler by emitMany, without passing the loggers, the records get its idxs"""
+        batch = []
+        for record in self.records( filePath ):
+            batch.append( record )
+            if len( batch ) == batchSize:
+                recordingHandler.emitMany( batch )
+                batch = []
+        if len( batch ):
+            recordingHandler.emitMany( batch )
         return self.lastReadEnd
 
-   
\ No newline at end of file
+    def toText(self, filePath : str, textFilePath : str, formatter : logging.Formatter )->None:
+        """Converts the file to a text hierarchical log, formatter is usually a HLogFormatter"""
+        with open( textFilePath, 'w' ) as f:
+            for record in self.records( filePath ):
+                f.write( formatter.format( record ) + '\n' )
@@ -41,7 +41,7 @@ class HierarchicalLogText(RecordingHandler, Frame):
     def __init__(self, master=None, logger: logging.Logger = logging.getLogger(),
                  fmt: str = None, maxCntRecords: int =  100000, **kw):
         Frame.__init__(self, master, **kw)
-        RecordingHandler.__init__(self, maxCntRecords = maxCntRecords )
+        RecordingHandler.__init__(self, maxCntRecords = maxCntRecords, messageIndex = True )
 
         HierarchicalLogText.ImageShowSubrecords = PhotoImage(file=os.path.join(HierarchicalLogText.ScriptDir, "plus.png"))
         HierarchicalLogText.ImageHideSubrecords = PhotoImage(file=os.path.join(HierarchicalLogText.ScriptDir, "minus.png"))
@@ -63,6 +63,21 @@ class HierarchicalLogText(RecordingHandler, Frame):
         self.scrollX.grid( row=1, column=0, sticky='ew' )
         self.scrollY.grid( row=0, column=1, sticky='ns')
 
+        # search box, backed by the message index
+        self.searchFrame = Frame( self )
+        self.searchFrame.grid_columnconfigure(0, weight = 1)
+        self.searchEntry = Entry( self.searchFrame )
+        self.searchEntry.bind('<Return>', self.searchNext)
+        self.searchNextButton = Button( self.searchFrame, text='Next', command=self.searchNext )
+        self.timeEntry = Entry( self.searchFrame, width=20 )
+        self.timeEntry.bind('<Return>', self.goToTime)
+        self.goToTimeButton = Button( self.searchFrame, text='Go to time', command=self.goToTime )
+        self.searchEntry.grid( row=0, column=0, sticky='ew' )
+        self.searchNextButton.grid( row=0, column=1 )
+        self.timeEntry.grid( row=0, column=2 )
+        self.goToTimeButton.grid( row=0, column=3 )
+        self.searchFrame.grid( row=2, column=0, columnspan=2, sticky='ew' )
+
         self.fmt = fmt
         if not self.fmt:
             self.fmt = ""
@@ -263,7 +278,6 @@ class HierarchicalLogText(RecordingHandler, Frame):
     # inserts a group of records at index 
     def insertRecordsAt(self, indicees, index, parent : HLogTextTreeRecord = None):
         cntInsertedLines = 0
-        maxChildLevelNo = -1
 
         if parent != None:
             # no parent treatment needed if already done for a previous record
@@ -271,12 +285,9 @@ class HierarchicalLogText(RecordingHandler, Frame):
                 self.updateParent( parent )
             if not parent.showSubrecords:
                 return 0
-            maxChildLevelNo = parent.maxChildLevelNo
 
         for idx in indicees:
             record = self.record( idx )
-            if record.levelno > maxChildLevelNo:
-                maxChildLevelNo = record.levelno
             if not self.passedFilter( record ):
                 continue
 
@@ -292,16 +303,32 @@ class HierarchicalLogText(RecordingHandler, Frame):
                 begin = self.logText.index( index + " + %s lines linestart" % cntInsertedLines )
                 cntInsertedLines += self.insertRecordsAt(self.getFilteredChildren( record.idx ), begin, record )
 
-        if parent != None and maxChildLevelNo > parent.levelno and maxChildLevelNo > parent.maxChildLevelNo:
-            begin,end = self.rangeFromMark(self.markFromIdx(parent.idx))
-            parent.maxChildLevelNo = maxChildLevelNo
-            self.updateRecordLevelTag( begin, end, parent )
-        
         return cntInsertedLines
 
-    def emit(self, record : HLogTextTreeRecord)->None:
-        RecordingHandler.emit( self, record )
+    def maxChildLevelChanged(self, idx : int)->None:
+        """ recolours a shown record, whose descendants got a higher level """
+        begin,end = self.rangeFromMark( self.markFromIdx( idx ) )
+        if begin is not None:
+            self.updateRecordLevelTag( begin, end, self.record( idx ) )
 
+    def recordsAppended(self, firstIdx : int, lastIdx : int)->None:
+        """ shows the appended records, a batch needs only one edit enabling and scrolling """
+        if self.ancestorsRevealed:
+            # matches of the record filter made hidden ancestors visible, they have to be inserted before
+            self.ancestorsRevealed = False
+            self.refresh()
+            return
+        self.enableEdit()
+        seeEnd = False
+        for idx in range( firstIdx, lastIdx + 1 ):
+            if self.showAppendedRecord( self.record( idx ) ) and self.activeIdx > idx:
+                seeEnd = True
+        if seeEnd:
+            self.logText.see(END)
+        self.disableEdit()
+
+    def showAppendedRecord(self, record : HLogTextTreeRecord) -> bool:
+        """ inserts an appended record if it is shown, returns True if inserted, editing has to be enabled """
         # no parent retrieving needed if already done for a previous record
         if self.lastHandledRecordHierarchyStage == record.hierarchyStage:
             parent = self.at( self.lastHandledParentIdx )
@@ -318,16 +345,10 @@ class HierarchicalLogText(RecordingHandler, Frame):
             isShow = parent.showSubrecords and parentIsShow
             if not isShow and parentIsShow:
                 if parent.idx != self.lastHandledParentIdx:
-                    self.enableEdit()
                     self.updateParent( parent )
-                    self.disableEdit()
 
         if isShow:
-            self.enableEdit()
             self.insertRecordsAt([ record.idx ], self.logText.index(END + " -1c"), parent)
-            if self.activeIdx > record.idx:
-                self.logText.see(END)
-            self.disableEdit()
 
         if isShow:
             self.lastHandledRecordHierarchyStage = record.hierarchyStage
@@ -339,9 +360,26 @@ class HierarchicalLogText(RecordingHandler, Frame):
         else:
             self.lastHandledParentIdx = -1
 
+        return isShow
+
+    def filteredRecordsChanged(self)->None:
+        self.refresh()
+
+    def refresh(self):
+        """ shows the stored records again, e.g. after the record filter changed """
+        self.enableEdit()
+        self.logText.delete( '1.0', END )
+        self.clearCache()
+        self.insertRecordsAt( self.getFilteredChildren( None ), '1.0' )
+        self.clearCache()
+        self.disableEdit()
+        if not self.logText.tag_ranges( self.markFromIdx( self.activeIdx ) ):
+            self.showEnd()
+            self.logText.see( END )
+
     # find showState recursive
     def isShow( self, idx ):
-        if not self.passedFilter( self.record( idx ) ):
+        if not self.passedFilterAt( idx ):
             return False
         parentIdx = self.parentIdx( idx )
         if parentIdx is None:
@@ -504,25 +542,11 @@ class HierarchicalLogText(RecordingHandler, Frame):
             self.logText.delete( groupBegin, groupEnd )
 
     def getVisibleChildren( self, idx = None ) -> list[int]:
-        if idx != None:
-            relIdx = min( idx, idx - (self.entireAdded - self.maxCntRecords) )
-            record = self.records[ relIdx ]
-            parentHierarchyStage = record.hierarchyStage
-            childIndex = self.logText.index( self.indexFromIdx( idx ) + "linestart +1 line" )
-        else:
-            parentHierarchyStage = -1
-            childIndex = "2.0"
-
+        """ children of idx which are currently shown, found via the sibling pointers instead of walking all lines """
         children = []
-        childIdx = self.idxFromIndex( childIndex )
-        while childIdx != None:
-            child = self.records[ childIdx - self.minIdx() ]
-            if child.hierarchyStage <= parentHierarchyStage:
-                break
-            if (child.hierarchyStage == parentHierarchyStage + 1):
+        for childIdx in self.children( idx ):
+            if self.logText.tag_ranges( self.markFromIdx( childIdx ) ):
                 children.append( childIdx )
-            childIndex = self.logText.index( childIndex + " +1 line")
-            childIdx = self.idxFromIndex( childIndex )
         return children
 
     def onMouseLeftDouble(self, event):
@@ -579,6 +603,59 @@ class HierarchicalLogText(RecordingHandler, Frame):
         else:
             self.updateRecordLevelTag( begin, end, self.record( idx ) )
         
+    def showIdx( self, idx ) -> bool:
+        """ expands the ancestors of idx and activates its record, returns False if it is filtered out """
+        ancestors = []
+        parentIdx = self.parentIdx( idx )
+        while parentIdx is not None:
+            ancestors.insert( 0, parentIdx )
+            parentIdx = self.parentIdx( parentIdx )
+        if not all( self.passedFilterAt( ancestorIdx ) for ancestorIdx in ancestors + [ idx ] ):
+            return False
+
+        for ancestorIdx in ancestors:
+            record = self.record( ancestorIdx )
+            if not record.showSubrecords:
+                self.clearCache()
+                self.enableEdit()
+                record.showSubrecords = True
+                begin,end = self.rangeFromMark( self.markFromIdx( ancestorIdx ) )
+                self.insertRecordsAt( self.getFilteredChildren( ancestorIdx ),
+                                      self.logText.index( end + " linestart + 1 line" ), record )
+                self.disableEdit()
+                self.clearCache()
+
+        if self.activeIdx != idx:
+            self.alterActiveRecord( idx )
+        self.logText.see( self.indexFromIdx( idx ) )
+        return True
+
+    def goToTime( self, event = None ):
+        """ shows the first record at or after the time of the time box, e.g. 14:03:22 at the day of the last record """
+        if len( self.records ) == 0:
+            return
+        try:
+            t = parseTime( self.timeEntry.get(), self.records.createdAt( len( self.records ) - 1 ) )
+        except ValueError:
+            return
+        # in created order, like idxAtTime, the records need not be appended in created order
+        idxs = self.rangeBetween( t, float( 'inf' ) )
+        if not len( idxs ):
+            idxs = [ self.maxIdx() ]
+        for idx in idxs:
+            if self.showIdx( idx ):
+                break
+
+    def searchNext( self, event = None ):
+        """ shows the next record matching the text of the search box, continues at the start after the end """
+        text = self.searchEntry.get()
+        startIdx = self.activeIdx if self.activeIdx <= self.maxIdx() else None
+        idx = self.nextMatch( text, startIdx, prefix = True )
+        if idx is None and startIdx is not None:
+            idx = self.nextMatch( text, None, prefix = True )
+        while idx is not None and not self.showIdx( idx ):
+            idx = self.nextMatch( text, idx, prefix = True )
+
     def showEnd(self):
         self.activeIdx = self.maxCntRecords
 
@@ -28,6 +28,9 @@ class HLogTextTreeRecord(HLogRecord):
     def ensure_HLogRecord(cls, record : HLogRecord | HLogTextTreeRecord) -> HLogTextTreeRecord:
         if isinstance(record, HLogTextTreeRecord):
             return record
+        if isinstance(record, SlimHLogRecord):
+            # slots prevent the class change, the itemId is kept in __dict__ instead
+            return record
         record.__class__ = HLogTextTreeRecord
         record.__dict__.update(record.__dict__)
         assert isinstance(record, HLogTextTreeRecord)
@@ -61,7 +64,7 @@ class HLogTextTkTreeView(RecordingHandler, Frame):
         self.showTimeCol = kw.get( 'showTimeCol', True)
         kw.pop('showTimeCol', None)
         Frame.__init__(self, master, **kw)
-        RecordingHandler.__init__(self, maxCntRecords = maxCntRecords )
+        RecordingHandler.__init__(self, maxCntRecords = maxCntRecords, messageIndex = True )
         HLogTextTkTreeView.CntCreated += 1
 
         self.name = kw.get( 'name', f"HierarchicalLogTextTree{HLogTextTkTreeView.CntCreated}")
@@ -100,6 +103,21 @@ class HLogTextTkTreeView(RecordingHandler, Frame):
         self.scrollY.grid( row=0, column=1, sticky='news')
         self.scrollX.grid( row=1, column=0, sticky='ew' )
 
+        # search box, backed by the message index
+        self.searchFrame = Frame( self )
+        self.searchFrame.grid_columnconfigure(0, weight = 1)
+        self.searchEntry = ttk.Entry( self.searchFrame )
+        self.searchEntry.bind('<Return>', self.searchNext)
+        self.searchNextButton = ttk.Button( self.searchFrame, text='Next', command=self.searchNext )
+        self.timeEntry = ttk.Entry( self.searchFrame, width=20 )
+        self.timeEntry.bind('<Return>', self.goToTime)
+        self.goToTimeButton = ttk.Button( self.searchFrame, text='Go to time', command=self.goToTime )
+        self.searchEntry.grid( row=0, column=0, sticky='ew' )
+        self.searchNextButton.grid( row=0, column=1 )
+        self.timeEntry.grid( row=0, column=2 )
+        self.goToTimeButton.grid( row=0, column=3 )
+        self.searchFrame.grid( row=2, column=0, columnspan=2, sticky='ew' )
+
         self.fmt = fmt
 
         # tagnames for levelnames
@@ -262,7 +280,6 @@ class HLogTextTkTreeView(RecordingHandler, Frame):
     def insertRecordsAt(self, indicees, index, parent : HLogTextTreeRecord | None = None):
         """ inserts a group of records at index """
         insertedIds : list[str] = []
-        maxChildLevelNo = -1
         parentId = ''
 
         if parent != None:
@@ -271,13 +288,10 @@ class HLogTextTkTreeView(RecordingHandler, Frame):
                 self.updateParent( parent )
             if not parent.showSubrecords:
                 return []
-            maxChildLevelNo = parent.maxChildLevelNo
             parentId = parent.itemId
 
         for idx in indicees:
             record = HLogTextTreeRecord.ensure_HLogRecord(self.record( idx ))
-            if record.levelno > maxChildLevelNo:
-                maxChildLevelNo = record.levelno
             if not self.passedFilter( record ):
                 continue
 
@@ -292,15 +306,30 @@ class HLogTextTkTreeView(RecordingHandler, Frame):
                 insertedIds.extend(self.insertRecordsAt(self.getFilteredChildren( record.idx ),\
                                                         index + len(insertedIds), record))
 
-        if parent != None and maxChildLevelNo > parent.levelno and maxChildLevelNo > parent.maxChildLevelNo:
-            parent.maxChildLevelNo = maxChildLevelNo
-            self.updateRecordLevelTag( parent )
-        
         return insertedIds
 
-    def emit(self, record : HLogRecord)->None:
-        RecordingHandler.emit( self, record )
-
+    def maxChildLevelChanged(self, idx : int)->None:
+        """ recolours a shown record, whose descendants got a higher level """
+        if self.logTextTree.exists( idx ):
+            self.updateRecordLevelTag( HLogTextTreeRecord.ensure_HLogRecord( self.record( idx ) ) )
+
+    def recordsAppended(self, firstIdx : int, lastIdx : int)->None:
+        """ shows the appended records, a batch is scrolled into view only once """
+        if self.ancestorsRevealed:
+            # matches of the record filter made hidden ancestors visible, they have to be inserted before
+            self.ancestorsRevealed = False
+            self.refresh()
+            return
+        seeEnd = False
+        for idx in range( firstIdx, lastIdx + 1 ):
+            if self.showAppendedRecord( self.record( idx ) ) and self.activeIdx > idx:
+                seeEnd = True
+        if seeEnd:
+            children = self.logTextTree.get_children()
+            self.logTextTree.see( children[-1] )
+
+    def showAppendedRecord(self, record : HLogRecord) -> bool:
+        """ inserts an appended record if it is shown, returns True if inserted """
         # no parent retrieving needed if already done for a previous record
         parent : HLogTextTreeRecord | None
         if self.lastHandledRecordHierarchyStage == record.hierarchyStage:
@@ -326,9 +355,6 @@ class HLogTextTkTreeView(RecordingHandler, Frame):
                 parentItemId = parent.itemId
             posAtParent = len(self.logTextTree.get_children( parentItemId ))
             self.insertRecordsAt([ record.idx ], posAtParent, parent )
-            if self.activeIdx > record.idx:
-                children = self.logTextTree.get_children()
-                self.logTextTree.see( children[-1] )
 
         if isShow:
             self.lastHandledRecordHierarchyStage = record.hierarchyStage
@@ -340,9 +366,26 @@ class HLogTextTkTreeView(RecordingHandler, Frame):
         else:
             self.lastHandledParentIdx = -1
 
+        return isShow
+
+    def filteredRecordsChanged(self)->None:
+        self.refresh()
+
+    def refresh(self):
+        """ shows the stored records again, e.g. after the record filter changed """
+        self.logTextTree.delete( *self.logTextTree.get_children() )
+        self.clearCache()
+        self.insertRecordsAt( self.getFilteredChildren( None ), 0 )
+        self.clearCache()
+        if not self.logTextTree.exists( self.activeIdx ):
+            self.activeIdx = self.maxCntRecords
+            children = self.logTextTree.get_children()
+            if len( children ):
+                self.logTextTree.see( children[-1] )
+
     # find showState recursive
     def isShow( self, idx ):
-        if not self.passedFilter( self.record( idx ) ):
+        if not self.passedFilterAt( idx ):
             return False
         parentIdx = self.parentIdx( idx )
         if parentIdx is None:
@@ -426,6 +469,58 @@ class HLogTextTkTreeView(RecordingHandler, Frame):
         self.updateRecordLevelTag( record )
         self.updateActiveRecordDetails()
 
+    def showIdx( self, idx : int ) -> bool:
+        """ opens the ancestors of idx and selects its record, returns False if it is filtered out """
+        ancestors = []
+        parentIdx = self.parentIdx( idx )
+        while parentIdx is not None:
+            ancestors.insert( 0, parentIdx )
+            parentIdx = self.parentIdx( parentIdx )
+        if not all( self.passedFilterAt( ancestorIdx ) for ancestorIdx in ancestors + [ idx ] ):
+            return False
+
+        for ancestorIdx in ancestors:
+            record = HLogTextTreeRecord.ensure_HLogRecord( self.record( ancestorIdx ) )
+            if not record.showSubrecords:
+                self.clearCache()
+                record.showSubrecords = True
+                self.logTextTree.item( ancestorIdx, open=True )
+                # children collapsed by the user are still items, only the never shown ones are inserted
+                for position, childIdx in enumerate( self.getFilteredChildren( ancestorIdx ) ):
+                    if not self.logTextTree.exists( childIdx ):
+                        self.insertRecordsAt( [ childIdx ], position, record )
+                self.clearCache()
+
+        self.logTextTree.see( idx )
+        self.select( idx )
+        return True
+
+    def goToTime( self, event = None ):
+        """ shows the first record at or after the time of the time box, e.g. 14:03:22 at the day of the last record """
+        if len( self.records ) == 0:
+            return
+        try:
+            t = parseTime( self.timeEntry.get(), self.records.createdAt( len( self.records ) - 1 ) )
+        except ValueError:
+            return
+        # in created order, like idxAtTime, the records need not be appended in created order
+        idxs = self.rangeBetween( t, float( 'inf' ) )
+        if not len( idxs ):
+            idxs = [ self.maxIdx() ]
+        for idx in idxs:
+            if self.showIdx( idx ):
+                break
+
+    def searchNext( self, event = None ):
+        """ selects the next record matching the text of the search box, continues at the start after the end """
+        text = self.searchEntry.get()
+        startIdx = self.activeIdx if self.activeIdx <= self.maxIdx() else None
+        idx = self.nextMatch( text, startIdx, prefix = True )
+        if idx is None and startIdx is not None:
+            idx = self.nextMatch( text, None, prefix = True )
+        while idx is not None and not self.showIdx( idx ):
+            idx = self.nextMatch( text, idx, prefix = True )
+
     def getItemIndent(self, itemId):
         """Berechnet die exakte Einrückung des Textes für ein Element in Pixeln."""
         # 1. Ebene (Tiefe) im Baum bestimmen
@@ -0,0 +1,143 @@
+import sys, os, time, logging, tempfile
+from collections import deque
+
+from hlog.hlog import *
+
+def bestOf( func, repeat : int = 3 ) -> float:
+    """ runs func repeat times and returns the best time in seconds """
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        func()
+        duration = time.perf_counter() - start
+        if best is None or duration < best:
+            best = duration
+    return best
+
+def benchmarkRingBuffer( cntRecords : int = 100000 ):
+    """ indexed access over a full buffer, deque(maxlen) vs. RingBuffer """
+    records = deque( maxlen=cntRecords )
+    ringBuffer = RingBuffer( cntRecords )
+    for i in range( 2 * cntRecords ):
+        records.append( i )
+        ringBuffer.append( i )
+
+    def traverse( buffer ):
+        def run():
+            for relIdx in range( 0, cntRecords ):
+                buffer[ relIdx ]
+        return run
+
+    dequeTime = bestOf( traverse( records ) )
+    ringBufferTime = bestOf( traverse( ringBuffer ) )
+    print( f"indexed traversal of {cntRecords} entries: deque {dequeTime:.3f}s, RingBuffer {ringBufferTime:.3f}s" )
+
+def benchmarkRecordFactory( cntRecords : int = 200000 ):
+    """ records/sec of the stock record factory vs. SlimHLogRecord, alone and via logger.info """
+    logger = logging.getLogger( 'benchmarkRecordFactory' )
+    logger.setLevel( logging.DEBUG )
+    logger.propagate = False
+    logger.addHandler( logging.NullHandler() )
+
+    def create():
+        factory = logging.getLogRecordFactory()
+        for i in range( cntRecords ):
+            factory( logger.name, logging.INFO, __file__, 0, "record %s", (i,), None, "create", None )
+
+    def log():
+        for i in range( cntRecords ):
+            logger.info( "record %s", i )
+
+    for slimRecords in [ False, True ]:
+        initLogHierarchy( logger, slimRecords )
+        createDuration = bestOf( create, 5 )
+        logDuration = bestOf( log, 5 )
+        resetLogHierarchy( logger )
+        name = "SlimHLogRecord" if slimRecords else "stock factory"
+        print( f"{name}: factory {cntRecords / createDuration:.0f} records/s, "
+               f"logger.info {cntRecords / logDuration:.0f} records/s" )
+
+def writeBenchmarkLog( logger : logging.Logger, fmt : str, cntLines : int ) -> tuple[str, int]:
+    """ writes a logfile of about cntLines lines, every tenth record has a continuation line """
+    logFile = os.path.join( tempfile.gettempdir(), 'benchmarkFileReader.log' )
+    fileHandler = logging.FileHandler( logFile, 'w' )
+    fileHandler.setFormatter( HLogFormatter( fmt, '%y-%m-%d %H:%M:%S' ) )
+    logger.addHandler( fileHandler )
+    cntWritten = 0
+    while cntWritten < cntLines:
+        with EnterLowerLogHierarchyStage( "stage", logger ):
+            for i in range( 8 ):
+                logger.info( "record %s", i )
+            logger.warning( "record\ncontinued" )
+        cntWritten += 11
+    logger.removeHandler( fileHandler )
+    fileHandler.close()
+    return logFile, cntWritten
+
+def benchmarkFileReader( cntLines : int = 1000000 ):
+    """ lines/sec of HLogFileReader.entries over a logfile """
+    fmt = '%(asctime)s - %(levelname)8s - %(message)s'
+    logger = logging.getLogger( 'benchmarkFileReader' )
+    logger.setLevel( logging.DEBUG )
+    logger.propagate = False
+    initLogHierarchy( logger )
+    logFile, cntWritten = writeBenchmarkLog( logger, fmt, cntLines )
+
+    logFileReader = HLogFileReader( logger, fmt )
+    def read():
+        for recordEntry in logFileReader.entries( logFile ):
+            pass
+    duration = bestOf( read )
+    resetLogHierarchy( logger )
+    os.remove( logFile )
+    print( f"HLogFileReader.entries: {cntWritten / duration:.0f} lines/s over {cntWritten} lines" )
+
+def benchmarkParallelReader( cntLines : int = 1000000 ):
+    """ scaling of HLogFileReader.readParallel and of the HLogFileModel scan with the count of worker processes """
+    fmt = '%(asctime)s - %(levelname)8s - %(message)s'
+    logger = logging.getLogger( 'benchmarkParallelReader' )
+    logger.setLevel( logging.DEBUG )
+    logger.propagate = False
+    initLogHierarchy( logger )
+    logFile, cntWritten = writeBenchmarkLog( logger, fmt, cntLines )
+    logFileReader = HLogFileReader( logger, fmt )
+
+    for maxWorkers in [ 1, 2, 4, 8 ]:
+        readDuration = bestOf( lambda : logFileReader.readParallel( logFile, RecordingHandler( cntWritten ), maxWorkers ), 1 )
+        modelDuration = bestOf( lambda : HLogFileModel( logFile, fmt, maxWorkers = maxWorkers ).close(), 1 )
+        print( f"{maxWorkers} workers: readParallel {cntWritten / readDuration:.0f} lines/s, "
+               f"HLogFileModel {cntWritten / modelDuration:.0f} lines/s" )
+    resetLogHierarchy( logger )
+    os.remove( logFile )
+
+def benchmarkBulkRead( cntLines : int = 300000 ):
+    """ lines/sec of HLogFileReader.read through the logger compared to the direct append to a RecordingHandler """
+    fmt = '%(asctime)s - %(levelname)8s - %(message)s'
+    logger = logging.getLogger( 'benchmarkBulkRead' )
+    logger.setLevel( logging.DEBUG )
+    logger.propagate = False
+    initLogHierarchy( logger )
+    logFile, cntWritten = writeBenchmarkLog( logger, fmt, cntLines )
+
+    def readLogged():
+        recordingHandler = RecordingHandler( cntWritten )
+        logger.addHandler( recordingHandler )
+        HLogFileReader( logger, fmt ).read( logFile )
+        logger.removeHandler( recordingHandler )
+    loggedDuration = bestOf( readLogged )
+    directDuration = bestOf( lambda : HLogFileReader( logger, fmt, recordingHandler = RecordingHandler( cntWritten ) ).read( logFile ) )
+    resetLogHierarchy( logger )
+    os.remove( logFile )
+    print( f"HLogFileReader.read: {cntWritten / loggedDuration:.0f} lines/s by the logger, "
+           f"{cntWritten / directDuration:.0f} lines/s into the RecordingHandler, x{loggedDuration / directDuration:.1f}" )
+
+Benchmarks = { 'ringBuffer' : benchmarkRingBuffer,
+               'recordFactory' : benchmarkRecordFactory,
+               'fileReader' : benchmarkFileReader,
+               'parallelReader' : benchmarkParallelReader,
+               'bulkRead' : benchmarkBulkRead }
+
+if __name__ == '__main__':
+    names = sys.argv[1:] if len(sys.argv) > 1 else Benchmarks.keys()
+    for name in names:
+        Benchmarks[name]()
@@ -10,6 +10,9 @@ from hlog.hlogTextTkText import *
 # Theme = 'default'
 Theme = 'vista'
 
+# poll interval in ms, while following a file
+FollowInterval = 500
+
 class HlogFileReaderDemoApp(tkinter.Frame):
     # init vars, create UI, start
     ######################################################################################################################
@@ -32,27 +35,45 @@ class HlogFileReaderDemoApp(tkinter.Frame):
         self.logger.addHandler(self.hLogText)
 
         self.logFileReader : HLogFileReader = HLogFileReader( self.logger, '%(asctime)s - %(levelname)8s - %(message)s' )
+        self.logFileReader.fileTruncated = lambda filePath : self.hLogText.clear()
+        self.pollId = None
 
         menu = Menu(root)
         menu.add_command(label="Read file ...", command=self.readFile)
+        menu.add_command(label="Follow file ...", command=self.followFile)
         root.config(menu=menu)
 
     def destroy(self):
+        self.stopFollow()
         self.logger.removeHandler( self.hLogText )
         resetLogHierarchy(self.logger)
         super().destroy()
 
     def readFile(self):
+        self.stopFollow()
         self.logger.hierarchyStage = -1
         self.hLogText.clear()
         filePath = tkinter.filedialog.askopenfilename(multiple = False, title = "Select LogFile to track ...")
         if filePath != '':
             self.logFileReader.read( filePath )
 
-    # see https://dev.to/stokry/monitor-files-for-changes-with-python-1npj
-    #from watchdog.observers import Observer
-    #from watchdog.
-    #def readFollow( self, filePath : str ):
+    def followFile(self):
+        self.stopFollow()
+        self.hLogText.clear()
+        filePath = tkinter.filedialog.askopenfilename(multiple = False, title = "Select LogFile to follow ...")
+        if filePath != '':
+            self.logFileReader.startFollow( filePath )
+            self.pollFollowed()
+
+    def pollFollowed(self):
+        self.logFileReader.poll()
+        self.pollId = self.after( FollowInterval, self.pollFollowed )
+
+    def stopFollow(self):
+        if self.pollId is not None:
+            self.after_cancel( self.pollId )
+            self.pollId = None
+        self.logFileReader.stopFollow()
 
 
 # create programm window and start mainloop